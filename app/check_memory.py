@@ -7,6 +7,66 @@ import json
 import os
 import sys
 
+# Import ijson conditionally so the utility still works without it
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Without ijson, prefer orjson's faster parser for the whole-file load
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def iter_memory_entries(f):
+    """Yield (entry_id, entry_data) pairs from an open memory file."""
+    if IJSON_AVAILABLE:
+        # Stream the top-level object instead of materializing it
+        yield from ijson.kvitems(f, '')
+    elif ORJSON_AVAILABLE:
+        yield from orjson.loads(f.read()).items()
+    else:
+        yield from json.load(f).items()
+
+def iter_log_entries(log_file):
+    """Yield (entry_id, entry_data) pairs from the append-only memory log, if any."""
+    if not os.path.exists(log_file):
+        return
+    with open(log_file, 'rb') as f:
+        for line in f:
+            try:
+                entry_data = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            yield entry_data['id'], entry_data
+
+def print_entry(entry_id, entry_data):
+    """Print the summary fields of a memory entry."""
+    print(f"\nEntry ID: {entry_id}")
+    print(f"  Prompt: {entry_data.get('original_prompt', 'N/A')}")
+    print(f"  Date: {entry_data.get('date', 'N/A')}")
+    print(f"  Image: {entry_data.get('image_path', 'N/A')}")
+    print(f"  Model: {entry_data.get('model_path', 'N/A')}")
+    
+    # Print tags if available
+    metadata = entry_data.get('metadata', {})
+    tags = metadata.get('tags', [])
+    if tags:
+        print(f"  Tags: {', '.join(tags)}")
+
+def find_json_files(path):
+    """Recursively yield paths of .json files (except tokens.json) under path."""
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from find_json_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                if entry.name.endswith('.json') and entry.name != 'tokens.json':
+                    yield entry.path
+
 def main():
     # Determine paths
     memory_file = os.path.join('datastore', 'memory.json')
@@ -18,37 +78,33 @@ def main():
         # Check for any other memory files
         search_path = 'datastore'
         if os.path.exists(search_path):
-            for root, dirs, files in os.walk(search_path):
-                for file in files:
-                    if file.endswith('.json') and file != 'tokens.json':
-                        print(f"Found potential memory file: {os.path.join(root, file)}")
+            for path in find_json_files(search_path):
+                print(f"Found potential memory file: {path}")
         
         return
     
     # Read the memory file
     try:
-        with open(memory_file, 'r') as f:
-            memory_data = json.load(f)
+        count = 0
+        with open(memory_file, 'rb') as f:
+            # Print details for each entry as it is parsed
+            for entry_id, entry_data in iter_memory_entries(f):
+                count += 1
+                print_entry(entry_id, entry_data)
         
-        # Print summary
-        print(f"Memory file contains {len(memory_data)} entries")
+        # Entries written since the last compaction live in the log
+        log_count = 0
+        for entry_id, entry_data in iter_log_entries(memory_file + '.log'):
+            log_count += 1
+            print_entry(entry_id, entry_data)
         
-        # Print details for each entry
-        for entry_id, entry_data in memory_data.items():
-            print(f"\nEntry ID: {entry_id}")
-            print(f"  Prompt: {entry_data.get('original_prompt', 'N/A')}")
-            print(f"  Date: {entry_data.get('date', 'N/A')}")
-            print(f"  Image: {entry_data.get('image_path', 'N/A')}")
-            print(f"  Model: {entry_data.get('model_path', 'N/A')}")
-            
-            # Print tags if available
-            metadata = entry_data.get('metadata', {})
-            tags = metadata.get('tags', [])
-            if tags:
-                print(f"  Tags: {', '.join(tags)}")
+        # Print summary
+        print(f"\nMemory file contains {count} entries")
+        if log_count:
+            print(f"Memory log contains {log_count} uncompacted writes")
     
     except Exception as e:
         print(f"Error reading memory file: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,12 +1,175 @@
 import os
-import base64
-from datetime import datetime
-from typing import Optional, Tuple, Union
+import binascii
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+# Import pybase64 conditionally; its SIMD codecs are much faster on large blobs
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+
+# Import Pillow conditionally; without it no listing thumbnails are written
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Longest side (pixels) of the thumbnails shown in result listings
+THUMBNAIL_SIZE = 512
+
+def _b64encode(data: bytes) -> str:
+    """Encode bytes to a base64 string without a trailing newline."""
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64encode_as_string(data)
+    return binascii.b2a_base64(data, newline=False).decode('ascii')
+
+def _b64decode(data: Union[bytes, str]) -> bytes:
+    """Decode base64 data, ignoring characters outside the base64 alphabet."""
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64decode(data, validate=False)
+    return binascii.a2b_base64(data)
+
+# How long (seconds) a cached missing-path check stays valid, and how many
+# entries the cache holds before expired ones are pruned
+PATH_CACHE_TTL = 1.0
+PATH_CACHE_PRUNE_SIZE = 1024
+
+# Cache of path -> checked_at for paths found missing, to avoid repeated
+# existence syscalls; paths that exist are never recorded, so saves don't grow it
+_missing_paths: Dict[str, float] = {}
+
+def _known_missing(path: str) -> bool:
+    """Check whether a path was found missing less than PATH_CACHE_TTL ago."""
+    checked_at = _missing_paths.get(path)
+    return checked_at is not None and time.monotonic() - checked_at < PATH_CACHE_TTL
+
+# Total bytes kept by the load_file cache, and the largest single file it will hold
+FILE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+FILE_CACHE_MAX_ENTRY_BYTES = 8 * 1024 * 1024
+
+# LRU of path -> (mtime_ns, size, data) for files read by load_file
+_file_cache: "OrderedDict[str, Tuple[int, int, bytes]]" = OrderedDict()
+_file_cache_bytes = 0
+_file_cache_lock = threading.Lock()
+
+def _file_cache_get(path: str, st: os.stat_result) -> Optional[bytes]:
+    """Return cached file data if it is still current for the given stat result."""
+    with _file_cache_lock:
+        cached = _file_cache.get(path)
+        if cached is None or cached[0] != st.st_mtime_ns or cached[1] != st.st_size:
+            return None
+        _file_cache.move_to_end(path)
+        return cached[2]
+
+def _file_cache_put(path: str, st: os.stat_result, data: bytes) -> None:
+    """Cache file data, evicting least recently used entries to stay within budget."""
+    global _file_cache_bytes
+    if len(data) > FILE_CACHE_MAX_ENTRY_BYTES:
+        return
+    with _file_cache_lock:
+        old = _file_cache.pop(path, None)
+        if old is not None:
+            _file_cache_bytes -= len(old[2])
+        _file_cache[path] = (st.st_mtime_ns, st.st_size, data)
+        _file_cache_bytes += len(data)
+        while _file_cache_bytes > FILE_CACHE_MAX_BYTES:
+            _, evicted = _file_cache.popitem(last=False)
+            _file_cache_bytes -= len(evicted[2])
+
+# Last formatted filename timestamp as [epoch_second, formatted]
+_ts_cache = [0, ""]
+
+def _fast_ts() -> str:
+    """Return the current local time as YYYYmmddHHMMSS, formatting once per second."""
+    t = int(time.time())
+    if t != _ts_cache[0]:
+        _ts_cache[:] = [t, time.strftime("%Y%m%d%H%M%S", time.localtime(t))]
+    return _ts_cache[1]
+
+def _write_file(filepath: str, data: bytes) -> None:
+    """Write bytes to a file with unbuffered os.write calls, without copying the data."""
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        written = 0
+        while written < len(view):
+            written += os.write(fd, view[written:])
+    finally:
+        os.close(fd)
+
+# Base64 characters decoded per write when saving a text payload
+BASE64_DECODE_CHUNK = 64 * 1024
+
+def _write_base64_file(filepath: str, text: str) -> None:
+    """Decode base64 text into a file chunk by chunk, never holding the whole decoded payload."""
+    # Single scan for a data-URL header such as "data:image/png;base64,"
+    head, sep, payload = text.partition("base64,")
+    if not sep:
+        payload = head
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        carry = ""
+        for start in range(0, len(payload), BASE64_DECODE_CHUNK):
+            # Drop line breaks, then decode whole 4-character groups only
+            piece = carry + "".join(payload[start:start + BASE64_DECODE_CHUNK].split())
+            usable = len(piece) - len(piece) % 4
+            carry = piece[usable:]
+            decoded = memoryview(_b64decode(piece[:usable]))
+            written = 0
+            while written < len(decoded):
+                written += os.write(fd, decoded[written:])
+        if carry:
+            os.write(fd, _b64decode(carry))
+    finally:
+        os.close(fd)
+
+def _write_payload(filepath: str, data: Union[bytes, str]) -> None:
+    """Write a payload given as raw bytes or as base64 text (optionally a data URL)."""
+    if isinstance(data, str):
+        _write_base64_file(filepath, data)
+    else:
+        _write_file(filepath, data)
+
+def _mark_exists(path: str, exists: bool = True) -> None:
+    """Record a known existence state for a path (e.g. after writing it)."""
+    if exists:
+        _missing_paths.pop(path, None)
+        return
+    now = time.monotonic()
+    if len(_missing_paths) >= PATH_CACHE_PRUNE_SIZE:
+        for stale, checked_at in list(_missing_paths.items()):
+            if now - checked_at >= PATH_CACHE_TTL:
+                _missing_paths.pop(stale, None)
+    _missing_paths[path] = now
+
+# Threads used to overlap stat calls for batches of paths
+STAT_WORKERS = 8
+_stat_pool: Optional[ThreadPoolExecutor] = None
+_stat_pool_lock = threading.Lock()
+
+def _get_stat_pool() -> ThreadPoolExecutor:
+    """Return the shared stat thread pool, creating it on first use."""
+    global _stat_pool
+    if _stat_pool is None:
+        with _stat_pool_lock:
+            if _stat_pool is None:
+                _stat_pool = ThreadPoolExecutor(max_workers=STAT_WORKERS, thread_name_prefix="file-stat")
+    return _stat_pool
 
 class FileManager:
     """
     Manages file operations for storing and retrieving image and 3D model files.
     
+    Binary payloads are kept as raw files on disk and memory entries only
+    reference them by path. Base64 encoding is meant for response layers
+    that need to embed the data (e.g. JSON or data URLs), not for storage.
+    
     Attributes:
         _base_dir (str): Base directory for file storage
         _image_dir (str): Directory for image files
@@ -24,47 +187,87 @@ class FileManager:
         self._image_dir = os.path.join(base_dir, 'images')
         self._model_dir = os.path.join(base_dir, 'models')
         
+        # Directory prefixes for building saved file paths without os.path.join
+        self._image_prefix = self._image_dir + os.sep
+        self._model_prefix = self._model_dir + os.sep
+        
         # Create directories if they don't exist
         os.makedirs(self._image_dir, exist_ok=True)
         os.makedirs(self._model_dir, exist_ok=True)
     
-    def save_image(self, image_data: bytes, identifier: str) -> str:
+    def save_image(self, image_data: Union[bytes, str], identifier: str) -> str:
         """
         Save image data to a file.
         
         Args:
-            image_data: Binary image data
+            image_data: Binary image data, or base64 text (optionally a data URL)
             identifier: Unique identifier for the file
             
         Returns:
             str: Path to the saved file
         """
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"img_{identifier}_{timestamp}.png"
-        filepath = os.path.join(self._image_dir, filename)
+        timestamp = _fast_ts()
+        filepath = f"{self._image_prefix}img_{identifier}_{timestamp}.png"
         
-        with open(filepath, 'wb') as f:
-            f.write(image_data)
+        _write_payload(filepath, image_data)
+        _mark_exists(filepath)
             
         return filepath
     
-    def save_model(self, model_data: bytes, identifier: str) -> str:
+    def save_thumbnail(self, image_path: str) -> Optional[str]:
+        """
+        Save a small WebP copy of an image for result listings.
+        
+        Args:
+            image_path: Path to the saved full-size image
+            
+        Returns:
+            Optional[str]: Path to the thumbnail, or None if Pillow is missing
+                or the image could not be decoded
+        """
+        if not PIL_AVAILABLE:
+            return None
+        
+        thumb_path = os.path.splitext(image_path)[0] + "_thumb.webp"
+        try:
+            with Image.open(image_path) as image:
+                image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+                image.save(thumb_path, "WEBP")
+        except (OSError, ValueError):
+            return None
+        _mark_exists(thumb_path)
+        return thumb_path
+    
+    def save_image_with_thumbnail(self, image_data: Union[bytes, str], identifier: str) -> Tuple[str, Optional[str]]:
+        """
+        Save image data to a file along with its listing thumbnail.
+        
+        Args:
+            image_data: Binary image data, or base64 text (optionally a data URL)
+            identifier: Unique identifier for the file
+            
+        Returns:
+            Tuple[str, Optional[str]]: (image path, thumbnail path or None)
+        """
+        image_path = self.save_image(image_data, identifier)
+        return image_path, self.save_thumbnail(image_path)
+    
+    def save_model(self, model_data: Union[bytes, str], identifier: str) -> str:
         """
         Save 3D model data to a file.
         
         Args:
-            model_data: Binary model data
+            model_data: Binary model data, or base64 text (optionally a data URL)
             identifier: Unique identifier for the file
             
         Returns:
             str: Path to the saved file
         """
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"model_{identifier}_{timestamp}.glb"
-        filepath = os.path.join(self._model_dir, filename)
+        timestamp = _fast_ts()
+        filepath = f"{self._model_prefix}model_{identifier}_{timestamp}.glb"
         
-        with open(filepath, 'wb') as f:
-            f.write(model_data)
+        _write_payload(filepath, model_data)
+        _mark_exists(filepath)
             
         return filepath
     
@@ -78,11 +281,22 @@ class FileManager:
         Returns:
             Optional[bytes]: File data if found, None otherwise
         """
-        if not os.path.exists(filepath):
+        if _known_missing(filepath):
             return None
             
-        with open(filepath, 'rb') as f:
-            return f.read()
+        # A single stat both checks existence and validates the cache
+        try:
+            st = os.stat(filepath)
+            _mark_exists(filepath)
+            data = _file_cache_get(filepath, st)
+            if data is None:
+                with open(filepath, 'rb') as f:
+                    data = f.read()
+                _file_cache_put(filepath, st, data)
+            return data
+        except FileNotFoundError:
+            _mark_exists(filepath, False)
+            return None
     
     def get_file_info(self, filepath: str) -> Tuple[bool, int, str]:
         """
@@ -94,12 +308,31 @@ class FileManager:
         Returns:
             Tuple[bool, int, str]: (exists, size, file_type)
         """
-        if not os.path.exists(filepath):
+        # A single stat gives both existence and size
+        try:
+            st = os.stat(filepath)
+        except FileNotFoundError:
+            _mark_exists(filepath, False)
             return (False, 0, "")
+        _mark_exists(filepath)
             
-        size = os.path.getsize(filepath)
         _, ext = os.path.splitext(filepath)
-        return (True, size, ext.lstrip('.'))
+        return (True, st.st_size, ext.lstrip('.'))
+    
+    def get_files_info(self, filepaths: Iterable[str]) -> Dict[str, Tuple[bool, int, str]]:
+        """
+        Get information about several files, overlapping their stat calls.
+        
+        Args:
+            filepaths: Paths to the files (duplicates are looked up once)
+            
+        Returns:
+            Dict[str, Tuple[bool, int, str]]: (exists, size, file_type) keyed by path
+        """
+        paths = list(dict.fromkeys(filepaths))
+        if len(paths) < 2:
+            return {path: self.get_file_info(path) for path in paths}
+        return dict(zip(paths, _get_stat_pool().map(self.get_file_info, paths)))
     
     def encode_to_base64(self, data: bytes) -> str:
         """
@@ -111,7 +344,25 @@ class FileManager:
         Returns:
             str: Base64-encoded string
         """
-        return base64.b64encode(data).decode('utf-8')
+        return _b64encode(data)
+    
+    def encode_to_base64_chunks(self, data: bytes, chunk_size: int = 57 * 1024) -> Iterator[str]:
+        """
+        Encode binary data to base64 in pieces, for streaming large payloads.
+        
+        Args:
+            data: Binary data
+            chunk_size: Raw bytes per piece; a multiple of 3 (57 * 1024 by
+                default) so the concatenated pieces equal the full encoding
+            
+        Yields:
+            str: Consecutive pieces of the base64-encoded string
+        """
+        if chunk_size % 3:
+            raise ValueError("chunk_size must be a multiple of 3")
+        view = memoryview(data)
+        for start in range(0, len(view), chunk_size):
+            yield _b64encode(view[start:start + chunk_size])
     
     def decode_from_base64(self, encoded: str) -> bytes:
         """
@@ -123,15 +374,20 @@ class FileManager:
         Returns:
             bytes: Decoded binary data
         """
-        return base64.b64decode(encoded)
+        return _b64decode(encoded)
 
 
-# Singleton instance for global access
-_file_manager = None
+# Singleton instance for global access, created lazily on first access (PEP 562)
+def __getattr__(name: str):
+    if name == "file_manager":
+        global file_manager
+        file_manager = FileManager()
+        return file_manager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_file_manager() -> FileManager:
     """Get or create the singleton file manager instance"""
-    global _file_manager
-    if _file_manager is None:
-        _file_manager = FileManager()
-    return _file_manager
\ No newline at end of file
+    try:
+        return file_manager
+    except NameError:
+        return __getattr__("file_manager")
\ No newline at end of file
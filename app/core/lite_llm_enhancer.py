@@ -3,15 +3,37 @@ Lightweight LLM Enhancer that uses smaller models or API-based alternatives.
 Provides the same interface as real_llm_enhancer.py but with lower memory usage.
 """
 
+import functools
 import logging
 import os
 import json
-from typing import Dict, List, Optional
+import re
+from typing import Dict, FrozenSet, List, Optional, Set
 import random
 
+logger = logging.getLogger(__name__)
+
 # Avoid importing torch and transformers to save memory
 # Instead, we'll implement a creative rule-based enhancer
 
+# Words (hyphenated words kept whole) in a lowercase prompt
+_TOKEN_RE = re.compile(r"[a-z]+(?:-[a-z]+)*")
+
+def _prompt_tokens(prompt: str) -> Set[str]:
+    """Tokenize a lowercase prompt into a set of words plus their simple singulars."""
+    tokens = set(_TOKEN_RE.findall(prompt))
+    tokens.update([word[:-1] for word in tokens if word.endswith('s')])
+    return tokens
+
+@functools.lru_cache(maxsize=1024)
+def _categorize(prompt_lower: str) -> str:
+    """Return the category for a lowercase prompt, cached for repeated prompts."""
+    tokens = _prompt_tokens(prompt_lower)
+    for category, keywords in LiteLLMEnhancer.CATEGORY_KEYWORDS:
+        if tokens & keywords:
+            return category
+    return "scene"  # Default category
+
 class LiteLLMEnhancer:
     """
     Memory-efficient LLM enhancer that uses rules and templates
@@ -21,73 +43,95 @@ class LiteLLMEnhancer:
     much less memory.
     """
     
+    # Fixed instance attributes; the enhancer is a per-process singleton
+    __slots__ = ("artistic_styles", "lighting", "perspectives", "quality", "templates", "_rng")
+    
+    # Keywords for each prompt category, checked in order of priority
+    CATEGORY_KEYWORDS = (
+        ("landscape", frozenset({"landscape", "mountain", "forest", "beach", "nature", "sky"})),
+        ("character", frozenset({"person", "man", "woman", "character", "face", "portrait"})),
+        ("object", frozenset({"object", "item", "tool", "device", "food"})),
+        ("abstract", frozenset({"abstract", "concept", "surreal"})),
+    )
+    
+    # Single-word and multi-word keywords that signal a memory query
+    MEMORY_KEYWORDS: FrozenSet[str] = frozenset({
+        "find", "retrieve", "get", "recall", "remember", "previous",
+        "earlier", "last", "any", "all"
+    })
+    MEMORY_PHRASES = ("show me", "like before", "like last time", "search for", "look for")
+    
+    # All memory keywords compiled into one alternation so a prompt is scanned once
+    MEMORY_QUERY_RE = re.compile(
+        r"\b(?:" + "|".join(map(re.escape, MEMORY_PHRASES + tuple(sorted(MEMORY_KEYWORDS)))) + r")\b"
+    )
+    
+    # Words that introduce an explicit search term ("like dragons")
+    SEARCH_TERM_MARKERS: FrozenSet[str] = frozenset({"like", "about", "with", "containing"})
+    
+    # Words ignored when extracting keywords from a memory query
+    COMMON_WORDS: FrozenSet[str] = frozenset({
+        "show", "me", "find", "get", "the", "a", "an", "in", "on", "with", "and", "or", "my"
+    })
+    
     def __init__(self):
         """Initialize the lite LLM enhancer."""
-        logging.info("Initializing Lite LLM Enhancer (low memory version)")
+        logger.info("Initializing Lite LLM Enhancer (low memory version)")
+        # Private generator so concurrent requests don't share the global random state
+        self._rng = random.Random()
         self._load_templates()
     
     def _load_templates(self):
         """Load enhancement templates and styles."""
         # Artistic styles that can be applied
-        self.artistic_styles = [
+        self.artistic_styles = (
             "photorealistic", "digital art", "oil painting", "watercolor", 
             "sketch", "anime", "pixel art", "3D render", "cinematic",
             "fantasy art", "concept art", "illustrated", "cartoon"
-        ]
+        )
         
         # Lighting conditions
-        self.lighting = [
+        self.lighting = (
             "soft lighting", "dramatic lighting", "backlit", "golden hour light",
             "blue hour", "studio lighting", "natural light", "neon lights",
             "moonlight", "sunrise", "sunset", "ambient occlusion", "ray tracing"
-        ]
+        )
         
         # Perspective options
-        self.perspectives = [
+        self.perspectives = (
             "wide angle", "close-up", "bird's eye view", "worm's eye view",
             "isometric view", "panoramic", "macro shot", "telephoto", "fisheye lens",
             "front view", "side view", "three-quarter view"
-        ]
+        )
         
         # Quality enhancers
-        self.quality = [
+        self.quality = (
             "high resolution", "detailed", "highly detailed", "intricate details",
             "sharp focus", "8K", "ultrarealistic", "professional", "award-winning",
             "masterpiece", "trending on artstation", "vivid colors"
-        ]
+        )
         
-        # Templates for different subject types
+        # Templates for different subject types, as the ordered fields joined with ", "
         self.templates = {
-            "landscape": "{subject}, {style}, {lighting}, {perspective}, {quality}",
-            "character": "{subject}, {style}, {lighting}, with {quality} details",
-            "object": "{subject}, {style}, {lighting}, {perspective} view, {quality}",
-            "abstract": "{subject}, {style}, {quality}, {lighting}",
-            "scene": "{subject}, {style}, {lighting}, {perspective}, {quality}"
+            "landscape": ("subject", "style", "lighting", "perspective", "quality"),
+            "character": ("subject", "style", "lighting", "quality_details"),
+            "object": ("subject", "style", "lighting", "perspective_view", "quality"),
+            "abstract": ("subject", "style", "quality", "lighting"),
+            "scene": ("subject", "style", "lighting", "perspective", "quality")
         }
     
     def _test_model(self):
         """Test the model with a simple prompt."""
         try:
             result = self.enhance_prompt("A cat")
-            logging.info(f"Test result: {result}")
+            logger.info("Test result: %s", result)
         except Exception as e:
-            logging.error(f"Error testing model: {e}")
+            logger.error("Error testing model: %s", e)
     
     def _categorize_prompt(self, prompt: str) -> str:
         """Categorize the prompt to apply the appropriate template."""
-        prompt_lower = prompt.lower()
-        
-        # Simple categorization based on keywords
-        if any(word in prompt_lower for word in ["landscape", "mountain", "forest", "beach", "nature", "sky"]):
-            return "landscape"
-        elif any(word in prompt_lower for word in ["person", "man", "woman", "character", "face", "portrait"]):
-            return "character"
-        elif any(word in prompt_lower for word in ["object", "item", "tool", "device", "food"]):
-            return "object"
-        elif any(word in prompt_lower for word in ["abstract", "concept", "surreal"]):
-            return "abstract"
-        else:
-            return "scene"  # Default category
+        # Simple categorization based on keywords (cached per prompt)
+        return _categorize(prompt.lower())
     
     def enhance_prompt(self, prompt: str) -> str:
         """
@@ -107,40 +151,45 @@ class LiteLLMEnhancer:
         category = self._categorize_prompt(prompt)
         
         # Select random elements for enhancement
-        style = random.choice(self.artistic_styles)
-        light = random.choice(self.lighting)
-        perspective = random.choice(self.perspectives)
-        quality_aspect = random.choice(self.quality)
+        style = self._rng.choice(self.artistic_styles)
+        light = self._rng.choice(self.lighting)
+        perspective = self._rng.choice(self.perspectives)
+        quality_aspect = self._rng.choice(self.quality)
         
         # Get the template
         template = self.templates.get(category, self.templates["scene"])
         
-        # Format the template
-        enhanced = template.format(
-            subject=prompt,
-            style=style,
-            lighting=light,
-            perspective=perspective,
-            quality=quality_aspect
-        )
+        # Fill the template fields in order
+        values = {
+            "subject": prompt,
+            "style": style,
+            "lighting": light,
+            "perspective": perspective,
+            "perspective_view": perspective + " view",
+            "quality": quality_aspect,
+            "quality_details": "with " + quality_aspect + " details"
+        }
+        parts = [values[field] for field in template]
         
         # Add some random additional details based on the category
         if category == "landscape":
-            times_of_day = ["dawn", "morning", "midday", "afternoon", "dusk", "night"]
-            weathers = ["clear sky", "cloudy", "foggy", "rainy", "snowy", "stormy"]
-            enhanced += f", {random.choice(times_of_day)}, {random.choice(weathers)}"
+            times_of_day = ("dawn", "morning", "midday", "afternoon", "dusk", "night")
+            weathers = ("clear sky", "cloudy", "foggy", "rainy", "snowy", "stormy")
+            parts += (self._rng.choice(times_of_day), self._rng.choice(weathers))
         
         elif category == "character":
-            emotions = ["happy", "sad", "thoughtful", "excited", "calm", "intense"]
-            positions = ["standing", "sitting", "walking", "resting", "action pose"]
-            enhanced += f", {random.choice(emotions)} expression, {random.choice(positions)}"
+            emotions = ("happy", "sad", "thoughtful", "excited", "calm", "intense")
+            positions = ("standing", "sitting", "walking", "resting", "action pose")
+            parts += (self._rng.choice(emotions) + " expression", self._rng.choice(positions))
         
         elif category == "object":
-            materials = ["metal", "wood", "glass", "plastic", "stone", "ceramic", "fabric"]
-            textures = ["smooth", "rough", "polished", "textured", "patterned", "glossy", "matte"]
-            enhanced += f", made of {random.choice(materials)}, {random.choice(textures)} texture"
+            materials = ("metal", "wood", "glass", "plastic", "stone", "ceramic", "fabric")
+            textures = ("smooth", "rough", "polished", "textured", "patterned", "glossy", "matte")
+            parts += ("made of " + self._rng.choice(materials), self._rng.choice(textures) + " texture")
         
-        logging.info(f"Enhanced prompt: {prompt} -> {enhanced}")
+        enhanced = ", ".join(parts)
+        
+        logger.debug("Enhanced prompt: %s -> %s", prompt, enhanced)
         return enhanced
     
     def is_memory_query(self, prompt: str) -> bool:
@@ -153,13 +202,7 @@ class LiteLLMEnhancer:
         Returns:
             bool: True if this is a memory query, False otherwise
         """
-        memory_keywords = [
-            "show me", "find", "retrieve", "get", "recall", "remember", 
-            "like before", "like last time", "previous", "earlier", "last",
-            "search for", "look for", "any", "all"
-        ]
-        
-        return any(keyword in prompt.lower() for keyword in memory_keywords)
+        return self.MEMORY_QUERY_RE.search(prompt.lower()) is not None
     
     def parse_memory_query(self, prompt: str) -> Dict:
         """
@@ -184,8 +227,9 @@ class LiteLLMEnhancer:
         
         # Extract search terms (simple approach - could be more sophisticated)
         words = query.split()
-        for i, word in enumerate(words):
-            if word in ["like", "about", "with", "containing"] and i < len(words) - 1:
+        word_set = set(words)
+        for i, word in enumerate(words[:-1]):
+            if word in self.SEARCH_TERM_MARKERS:
                 result["search_terms"].append(words[i+1])
                 
         # Look for time-related terms
@@ -195,15 +239,15 @@ class LiteLLMEnhancer:
             result["reverse"] = False
             
         # Look for count terms
-        if "last" in query and any(word.isdigit() for word in words):
-            for i, word in enumerate(words):
-                if word == "last" and i < len(words) - 1 and words[i+1].isdigit():
+        if "last" in word_set:
+            for i, word in enumerate(words[:-1]):
+                if word == "last" and words[i+1].isdigit():
                     result["limit"] = int(words[i+1])
         
         # If no specific search terms, extract potential keywords
         if not result["search_terms"]:
             # Remove common words
-            common_words = ["show", "me", "find", "get", "the", "a", "an", "in", "on", "with", "and", "or", "my"]
+            common_words = self.COMMON_WORDS
             filtered_words = [w for w in words if w not in common_words and len(w) > 3]
             
             # Handle plural/singular forms
@@ -219,12 +263,9 @@ class LiteLLMEnhancer:
         return result
 
 
-# Singleton instance for global access
-_llm_enhancer = None
+# Singleton instance for global access; construction is cheap, so build it at import
+lite_llm_enhancer = LiteLLMEnhancer()
 
 def get_lite_llm_enhancer() -> LiteLLMEnhancer:
-    """Get or create the singleton LLM enhancer instance"""
-    global _llm_enhancer
-    if _llm_enhancer is None:
-        _llm_enhancer = LiteLLMEnhancer()
-    return _llm_enhancer
\ No newline at end of file
+    """Get the singleton LLM enhancer instance"""
+    return lite_llm_enhancer
\ No newline at end of file
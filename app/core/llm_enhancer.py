@@ -1,7 +1,31 @@
+import functools
 import logging
 import random
 import re
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Words (hyphenated words kept whole, e.g. "sci-fi") in a lowercase prompt
+_TOKEN_RE = re.compile(r"[a-z]+(?:-[a-z]+)*")
+
+# Alphanumeric tokens of a lowercase memory query (digits kept for counts)
+_QUERY_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def _prompt_tokens(prompt: str) -> Set[str]:
+    """Tokenize a lowercase prompt into a set of words plus their simple singulars."""
+    tokens = set(_TOKEN_RE.findall(prompt))
+    tokens.update([word[:-1] for word in tokens if word.endswith('s')])
+    return tokens
+
+@functools.lru_cache(maxsize=1024)
+def _classify(prompt_lower: str) -> str:
+    """Return the category for a lowercase prompt, cached for repeated prompts."""
+    tokens = _prompt_tokens(prompt_lower)
+    for category, keywords in LLMEnhancer.CATEGORY_KEYWORDS:
+        if tokens & keywords:
+            return category
+    return "object"
 
 class LLMEnhancer:
     """
@@ -11,47 +35,79 @@ class LLMEnhancer:
     This simulation demonstrates the architecture while avoiding external API dependencies.
     """
     
+    # Fixed instance attributes; the enhancer is a per-process singleton
+    __slots__ = ("_rng",)
+    
     # Predefined details for various prompt categories
     DESCRIPTIVE_DETAILS = {
-        "animal": [
+        "animal": (
             "with intricate fur patterns", "showing detailed skin texture", 
             "with realistic eyes that reflect light", "in dynamic motion",
             "with anatomically correct features", "showcasing natural behavior"
-        ],
-        "person": [
+        ),
+        "person": (
             "with detailed facial expressions", "wearing intricate clothing with fabric folds",
             "in dynamic pose showing emotion", "with realistic skin texture and tone",
             "with detailed hair that catches the light", "with anatomically correct proportions"
-        ],
-        "landscape": [
+        ),
+        "landscape": (
             "with atmospheric perspective", "showing realistic lighting conditions",
             "with detailed foliage and terrain", "featuring realistic water reflections",
             "with volumetric clouds and sky", "showing accurate environmental details"
-        ],
-        "object": [
+        ),
+        "object": (
             "with realistic material textures", "showing accurate surface reflections",
             "with fine mechanical details", "featuring realistic wear patterns",
             "with proper scale and proportions", "showing intricate design elements"
-        ],
-        "fantasy": [
+        ),
+        "fantasy": (
             "with otherworldly lighting effects", "showing magical atmospheric elements",
             "with surreal yet consistent physics", "featuring imaginative yet cohesive design",
             "with fantastical but believable textures", "showcasing impossible yet harmonious compositions"
-        ],
-        "sci-fi": [
+        ),
+        "sci-fi": (
             "with futuristic lighting and reflections", "showing advanced technological details",
             "with mechanical and electronic elements", "featuring sleek, functional design",
             "with holographic or energy effects", "showcasing innovative yet plausible concepts"
-        ]
+        )
     }
     
     # Style additions to enhance prompts
-    STYLE_ENHANCEMENTS = [
+    STYLE_ENHANCEMENTS = (
         "photorealistic", "hyperdetailed", "8k resolution", "dramatic lighting",
         "cinematic composition", "professional photography", "volumetric lighting",
         "physically accurate rendering", "detailed textures", "high dynamic range",
         "award-winning", "trending on artstation", "octane render"
-    ]
+    )
+    
+    # Keywords for each prompt category, checked in order of priority
+    CATEGORY_KEYWORDS = (
+        ("person", frozenset({"person", "man", "woman", "child", "portrait", "face", "people"})),
+        ("animal", frozenset({"animal", "dog", "cat", "bird", "wildlife", "creature"})),
+        ("landscape", frozenset({"landscape", "mountain", "ocean", "forest", "sunset", "nature"})),
+        ("fantasy", frozenset({"magic", "dragon", "wizard", "fairy", "mythical", "fantasy"})),
+        ("sci-fi", frozenset({"robot", "spaceship", "futuristic", "tech", "sci-fi"})),
+    )
+    
+    # Single-word and multi-word keywords that signal a memory query
+    MEMORY_KEYWORDS: FrozenSet[str] = frozenset({
+        "find", "retrieve", "get", "recall", "remember", "previous",
+        "earlier", "last", "any", "all"
+    })
+    MEMORY_PHRASES = ("show me", "like before", "like last time", "search for", "look for")
+    
+    # All memory keywords compiled into one alternation so a prompt is scanned once
+    MEMORY_QUERY_RE = re.compile(
+        r"\b(?:" + "|".join(map(re.escape, MEMORY_PHRASES + tuple(sorted(MEMORY_KEYWORDS)))) + r")\b"
+    )
+    
+    # Words that introduce an explicit search term ("like dragons")
+    SEARCH_TERM_MARKERS: FrozenSet[str] = frozenset({"like", "about", "with", "containing"})
+    
+    # Words ignored when extracting keywords from a memory query
+    COMMON_WORDS: FrozenSet[str] = frozenset({
+        "show", "me", "find", "get", "the", "a", "an", "in", "on", "with", "and", "or", "my"
+    })
     
     # Words to normalize for search (singular/plural forms)
     WORD_NORMALIZATIONS = {
@@ -68,7 +124,9 @@ class LLMEnhancer:
     
     def __init__(self):
         """Initialize the LLM enhancer."""
-        logging.info("Initializing LLM Enhancer (simulation)")
+        logger.info("Initializing LLM Enhancer (simulation)")
+        # Private generator so concurrent requests don't share the global random state
+        self._rng = random.Random()
     
     def enhance_prompt(self, prompt: str) -> str:
         """
@@ -90,15 +148,27 @@ class LLMEnhancer:
         details = self.DESCRIPTIVE_DETAILS.get(category, self.DESCRIPTIVE_DETAILS["object"])
         
         # Select random details and styles
-        selected_details = random.sample(details, min(2, len(details)))
-        selected_styles = random.sample(self.STYLE_ENHANCEMENTS, min(3, len(self.STYLE_ENHANCEMENTS)))
+        selected_details = self._rng.sample(details, min(2, len(details)))
+        selected_styles = self._rng.sample(self.STYLE_ENHANCEMENTS, min(3, len(self.STYLE_ENHANCEMENTS)))
         
         # Create enhanced prompt with original prompt first, then details, then style
-        enhanced_prompt = f"{prompt}, {', '.join(selected_details)}, {', '.join(selected_styles)}"
+        enhanced_prompt = ", ".join([prompt, *selected_details, *selected_styles])
         
-        logging.info(f"Enhanced prompt: {prompt} -> {enhanced_prompt}")
+        logger.debug("Enhanced prompt: %s -> %s", prompt, enhanced_prompt)
         return enhanced_prompt
-    
+
+    def enhance_prompts(self, prompts: List[str]) -> List[str]:
+        """
+        Enhance several user prompts at once.
+
+        Args:
+            prompts: The users' original prompts
+
+        Returns:
+            List[str]: Enhanced prompts, in the same order as the input
+        """
+        return [self.enhance_prompt(prompt) for prompt in prompts]
+
     def _classify_prompt(self, prompt: str) -> str:
         """
         Classify a prompt into a category based on keywords.
@@ -109,19 +179,8 @@ class LLMEnhancer:
         Returns:
             str: Category label
         """
-        # Simple keyword-based classification
-        if any(word in prompt for word in ["person", "man", "woman", "child", "portrait", "face", "people"]):
-            return "person"
-        elif any(word in prompt for word in ["animal", "dog", "cat", "bird", "wildlife", "creature"]):
-            return "animal"
-        elif any(word in prompt for word in ["landscape", "mountain", "ocean", "forest", "sunset", "nature"]):
-            return "landscape"
-        elif any(word in prompt for word in ["magic", "dragon", "wizard", "fairy", "mythical", "fantasy"]):
-            return "fantasy"
-        elif any(word in prompt for word in ["robot", "spaceship", "futuristic", "tech", "sci-fi"]):
-            return "sci-fi"
-        else:
-            return "object"
+        # Simple keyword-based classification (cached per prompt)
+        return _classify(prompt)
     
     def is_memory_query(self, prompt: str) -> bool:
         """
@@ -133,13 +192,7 @@ class LLMEnhancer:
         Returns:
             bool: True if this is a memory query, False otherwise
         """
-        memory_keywords = [
-            "show me", "find", "retrieve", "get", "recall", "remember", 
-            "like before", "like last time", "previous", "earlier", "last",
-            "search for", "look for", "any", "all"
-        ]
-        
-        return any(keyword in prompt.lower() for keyword in memory_keywords)
+        return self.MEMORY_QUERY_RE.search(prompt.lower()) is not None
     
     def parse_memory_query(self, prompt: str) -> Dict:
         """
@@ -161,9 +214,9 @@ class LLMEnhancer:
         }
         
         # Extract search terms (simple approach - could be more sophisticated)
-        words = query.split()
-        for i, word in enumerate(words):
-            if word in ["like", "about", "with", "containing"] and i < len(words) - 1:
+        words = _QUERY_TOKEN_RE.findall(query)
+        for i, word in enumerate(words[:-1]):
+            if word in self.SEARCH_TERM_MARKERS:
                 result["search_terms"].append(words[i+1])
                 
         # Look for time-related terms
@@ -173,44 +226,45 @@ class LLMEnhancer:
             result["reverse"] = False
             
         # Look for count terms
-        if "last" in query and any(word.isdigit() for word in words):
-            for i, word in enumerate(words):
-                if word == "last" and i < len(words) - 1 and words[i+1].isdigit():
-                    result["limit"] = int(words[i+1])
+        for i, word in enumerate(words[:-1]):
+            if word == "last" and words[i+1].isdigit():
+                result["limit"] = int(words[i+1])
         
         # If no specific search terms, extract potential keywords
         if not result["search_terms"]:
-            # Remove common words
-            common_words = ["show", "me", "find", "get", "the", "a", "an", "in", "on", "with", "and", "or", "my"]
-            filtered_words = [w for w in words if w not in common_words and len(w) > 3]
-            
-            # Normalize words (singular/plural)
-            normalized_words = []
-            for word in filtered_words:
-                # Check if we have a normalized form
-                normalized = self.WORD_NORMALIZATIONS.get(word, word)
-                # Also handle simple plural forms (adding 's')
-                if word.endswith('s') and word[:-1] not in common_words:
-                    normalized = word[:-1]
-                normalized_words.append(normalized)
-                
-            if normalized_words:
-                result["search_terms"] = normalized_words
+            # Normalize each keyword (singular/plural) in one pass, skipping common words
+            search_terms = []
+            seen = set()
+            keywords = []
+            for word in words:
+                if len(word) <= 3 or word in self.COMMON_WORDS:
+                    continue
+                keywords.append(word)
+                normalized = self.WORD_NORMALIZATIONS.get(word)
+                if normalized is None:
+                    # Also handle simple plural forms (adding 's')
+                    if word.endswith('s') and word[:-1] not in self.COMMON_WORDS:
+                        normalized = word[:-1]
+                    else:
+                        normalized = word
+                if normalized not in seen:
+                    seen.add(normalized)
+                    search_terms.append(normalized)
                 
-                # Also include original words for exact matches
-                for word in filtered_words:
-                    if word not in result["search_terms"]:
-                        result["search_terms"].append(word)
+            # Also include original words for exact matches
+            for word in keywords:
+                if word not in seen:
+                    seen.add(word)
+                    search_terms.append(word)
+                    
+            result["search_terms"] = search_terms
         
         return result
 
 
-# Singleton instance for global access
-_llm_enhancer = None
+# Singleton instance for global access; construction is cheap, so build it at import
+llm_enhancer = LLMEnhancer()
 
 def get_llm_enhancer() -> LLMEnhancer:
-    """Get or create the singleton LLM enhancer instance"""
-    global _llm_enhancer
-    if _llm_enhancer is None:
-        _llm_enhancer = LLMEnhancer()
-    return _llm_enhancer
\ No newline at end of file
+    """Get the singleton LLM enhancer instance"""
+    return llm_enhancer
\ No newline at end of file
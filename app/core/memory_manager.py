@@ -1,10 +1,71 @@
+import heapq
 import json
 import os
+import re
+import sys
+import threading
 import time
 import uuid
 import logging
+import operator
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Union, Set
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union, Set
+
+# Import fcntl conditionally; without it (e.g. on Windows) storage is not locked
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# Import orjson conditionally; stdlib json is the fallback codec
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize an object to compact JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode('utf-8')
+
+def _loads(data: Union[bytes, str]) -> Any:
+    """Deserialize JSON bytes or text (raises json.JSONDecodeError on bad input)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Word tokens used by the search index
+_WORD_RE = re.compile(r"\w+")
+
+def _tokenize(text: str) -> Set[str]:
+    """Split lowercase text into a set of word tokens, interned to share storage."""
+    return {sys.intern(token) for token in _WORD_RE.findall(text)}
+
+def _trigrams(token: str) -> Set[str]:
+    """Get the three-character substrings of a token."""
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+# Size (bytes) at which the append-only log is folded back into the snapshot
+LOG_COMPACT_THRESHOLD = 16 * 1024 * 1024
+
+# Last timestamp handed out, so entries created in quick succession (or from
+# several threads) still get strictly increasing timestamps
+_last_timestamp = 0.0
+_timestamp_lock = threading.Lock()
+
+def _next_timestamp() -> float:
+    """Return the current time, nudged forward if needed to exceed the last one returned."""
+    global _last_timestamp
+    with _timestamp_lock:
+        now = time.time()
+        if now <= _last_timestamp:
+            now = _last_timestamp + 1e-6
+        _last_timestamp = now
+        return now
 
 # Memory entry structure
 class MemoryEntry:
@@ -14,6 +75,7 @@ class MemoryEntry:
     Attributes:
         id (str): Unique identifier for the memory entry
         timestamp (float): Unix timestamp when entry was created
+        date (str): Creation time for display, formatted from timestamp on first access
         original_prompt (str): The user's original prompt
         enhanced_prompt (str): The LLM-enhanced prompt
         image_path (str): Path to the generated image
@@ -21,20 +83,46 @@ class MemoryEntry:
         metadata (Dict): Additional metadata (tags, description, etc.)
     """
     
+    # Fixed attribute set, so entries carry no per-instance __dict__
+    __slots__ = ('id', 'timestamp', '_date', 'original_prompt', 'enhanced_prompt',
+                 'image_path', 'model_path', 'metadata', '_search_blob')
+    
     def __init__(self, 
                  original_prompt: str, 
                  enhanced_prompt: Optional[str] = None,
                  image_path: Optional[str] = None,
                  model_path: Optional[str] = None,
-                 metadata: Optional[Dict] = None):
-        self.id = str(uuid.uuid4())
-        self.timestamp = time.time()
-        self.date = datetime.fromtimestamp(self.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+                 metadata: Optional[Dict] = None,
+                 timestamp: Optional[float] = None):
+        self.id = uuid.uuid4().hex
+        self.timestamp = _next_timestamp() if timestamp is None else timestamp
+        # Formatted from the timestamp on first access
+        self._date: Optional[str] = None
         self.original_prompt = original_prompt
         self.enhanced_prompt = enhanced_prompt
         self.image_path = image_path
         self.model_path = model_path
         self.metadata = metadata or {}
+        # Lowercased prompt/tag text, built on first use and reset when the entry changes
+        self._search_blob: Optional[str] = None
+    
+    @property
+    def date(self) -> str:
+        """Local creation time formatted as YYYY-mm-dd HH:MM:SS"""
+        if self._date is None:
+            self._date = datetime.fromtimestamp(self.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+        return self._date
+    
+    @date.setter
+    def date(self, value: str) -> None:
+        self._date = value
+    
+    def search_blob(self) -> str:
+        """Get the lowercased prompt and tag text used for searching"""
+        if self._search_blob is None:
+            tags = " ".join(self.metadata.get("tags", []))
+            self._search_blob = f"{self.original_prompt} {self.enhanced_prompt or ''} {tags}".lower()
+        return self._search_blob
     
     def to_dict(self) -> Dict:
         """Convert memory entry to a dictionary for storage"""
@@ -52,16 +140,23 @@ class MemoryEntry:
     @classmethod
     def from_dict(cls, data: Dict) -> 'MemoryEntry':
         """Create a memory entry from a dictionary"""
-        entry = cls(
-            original_prompt=data['original_prompt'],
-            enhanced_prompt=data.get('enhanced_prompt'),
-            image_path=data.get('image_path'),
-            model_path=data.get('model_path'),
-            metadata=data.get('metadata', {})
-        )
+        metadata = data.get('metadata', {})
+        # Intern tags so repeated tag strings share one object across entries
+        if metadata.get('tags'):
+            metadata['tags'] = [sys.intern(tag) for tag in metadata['tags']]
+            
+        # Bypass __init__, which would generate an id and timestamp only to overwrite them
+        entry = cls.__new__(cls)
         entry.id = data['id']
         entry.timestamp = data['timestamp']
-        entry.date = data.get('date', datetime.fromtimestamp(entry.timestamp).strftime('%Y-%m-%d %H:%M:%S'))
+        date = data.get('date')
+        entry._date = sys.intern(date) if date else None
+        entry.original_prompt = data['original_prompt']
+        entry.enhanced_prompt = data.get('enhanced_prompt')
+        entry.image_path = data.get('image_path')
+        entry.model_path = data.get('model_path')
+        entry.metadata = metadata or {}
+        entry._search_blob = None
         return entry
 
 
@@ -72,7 +167,18 @@ class MemoryManager:
     Attributes:
         _short_term_memory (Dict[str, MemoryEntry]): Session memory (lost on restart)
         _storage_path (str): Path to persistent storage file
-        _memory_file (str): Filename for persistent storage
+        _memory_file (str): Filename for persistent storage (snapshot of all entries)
+        _log_file (str): Append-only log of entries written since the last snapshot
+        _all_entries (Dict[str, MemoryEntry]): In-memory index of all persisted entries
+        _postings (Dict[str, Set[str]]): Inverted index from search token to entry IDs
+        _entry_tokens (Dict[str, Set[str]]): Tokens each persisted entry is indexed under
+        _trigrams (Dict[str, Set[str]]): Index from trigram to the indexed tokens containing it
+        _version (int): Counter bumped whenever the persisted entries change
+        _lock (threading.RLock): Guards the in-memory index and pending batch across threads
+    
+    Each persisted entry is appended to the log as one JSON line; the snapshot
+    is only rewritten by compact(), once the log grows past LOG_COMPACT_THRESHOLD.
+    Persisted entries are loaded once at startup and served from memory after that.
     """
     
     def __init__(self, storage_path: str = None, memory_file: str = 'memory.json'):
@@ -97,17 +203,122 @@ class MemoryManager:
             self._storage_path = storage_path
             
         self._memory_file = os.path.join(self._storage_path, memory_file)
+        self._log_file = self._memory_file + '.log'
+        # Serializes log appends and compaction across processes sharing the datastore
+        self._lock_file = self._memory_file + '.lock'
+        self._log_fh = None
+        # Entries awaiting a single log write while inside batch()
+        self._pending: Optional[Dict[str, MemoryEntry]] = None
+        self._version = 0
+        self._lock = threading.RLock()
         
-        logging.info(f"Memory manager initialized with file: {self._memory_file}")
+        logging.info("Memory manager initialized with file: %s", self._memory_file)
         
         # Create storage directory if it doesn't exist
         os.makedirs(self._storage_path, exist_ok=True)
         
         # Initialize long-term memory if it doesn't exist
         if not os.path.exists(self._memory_file):
-            with open(self._memory_file, 'w') as f:
-                json.dump({}, f)
-            logging.info(f"Created new memory file at: {self._memory_file}")
+            self._write_snapshot({})
+            logging.info("Created new memory file at: %s", self._memory_file)
+        
+        # Load persisted entries once; they are kept in sync by store/clear_all
+        self._all_entries: Dict[str, MemoryEntry] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._entry_tokens: Dict[str, Set[str]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        try:
+            for entry_id, entry_data in self._load_entries().items():
+                entry = MemoryEntry.from_dict(entry_data)
+                self._all_entries[entry_id] = entry
+                self._index_entry(entry)
+        except (json.JSONDecodeError, FileNotFoundError) as e:
+            logging.error("Error loading memory: %s", e)
+        logging.info("Loaded %s entries from memory", len(self._all_entries))
+    
+    @property
+    def version(self) -> int:
+        """Counter that changes whenever persisted entries are added, updated or cleared."""
+        return self._version
+    
+    def _index_entry(self, entry: MemoryEntry) -> None:
+        """
+        (Re)index an entry's prompts and tags in the inverted index.
+        
+        Args:
+            entry: The memory entry to index
+        """
+        tokens = _tokenize(entry.search_blob())
+        
+        # Drop postings for tokens the entry no longer contains
+        old_tokens = self._entry_tokens.get(entry.id, set())
+        for token in old_tokens - tokens:
+            postings = self._postings[token]
+            postings.discard(entry.id)
+            if not postings:
+                del self._postings[token]
+                for trigram in _trigrams(token):
+                    tokens_with_trigram = self._trigrams[trigram]
+                    tokens_with_trigram.discard(token)
+                    if not tokens_with_trigram:
+                        del self._trigrams[trigram]
+                
+        for token in tokens - old_tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                for trigram in _trigrams(token):
+                    self._trigrams.setdefault(trigram, set()).add(token)
+            postings.add(entry.id)
+        self._entry_tokens[entry.id] = tokens
+    
+    def _tokens_containing(self, term: str) -> Iterable[str]:
+        """
+        Find the indexed tokens that contain a search term.
+        
+        Args:
+            term: Lowercase search term
+            
+        Returns:
+            Iterable[str]: Indexed tokens with the term as a substring
+        """
+        if len(term) < 3:
+            # Too short to have a trigram; check every token
+            return [token for token in self._postings if term in token]
+        
+        # Intersect the token sets of the term's trigrams, smallest first
+        candidates = None
+        for token_set in sorted((self._trigrams.get(trigram, ()) for trigram in _trigrams(term)), key=len):
+            candidates = set(token_set) if candidates is None else candidates & token_set
+            if not candidates:
+                return ()
+        # Sharing every trigram doesn't guarantee the term appears contiguously
+        return [token for token in candidates if term in token]
+    
+    def _load_entries(self) -> Dict[str, Dict]:
+        """
+        Load all persisted entries: the snapshot, then the log replayed on top.
+        
+        Returns:
+            Dict[str, Dict]: Entry dictionaries keyed by entry ID
+        """
+        with open(self._memory_file, 'rb') as f:
+            memory_data = _loads(f.read())
+        
+        try:
+            with open(self._log_file, 'rb') as f:
+                for line in f:
+                    try:
+                        data = _loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from an interrupted write
+                        logging.warning("Skipping unreadable line in %s", self._log_file)
+                        continue
+                    memory_data[data['id']] = data
+        except FileNotFoundError:
+            pass
+        
+        return memory_data
     
     def store(self, memory_entry: MemoryEntry, persist: bool = True) -> str:
         """
@@ -125,10 +336,55 @@ class MemoryManager:
         
         # Store in long-term memory if requested
         if persist:
-            self._persist_to_storage(memory_entry)
+            with self._lock:
+                # The entry may have been edited in place since it was last indexed
+                memory_entry._search_blob = None
+                self._all_entries[memory_entry.id] = memory_entry
+                self._index_entry(memory_entry)
+                self._version += 1
+                if self._pending is not None:
+                    self._pending[memory_entry.id] = memory_entry
+                else:
+                    self._persist_to_storage([memory_entry])
         
         return memory_entry.id
     
+    def store_batch(self, memory_entries: List[MemoryEntry], persist: bool = True) -> List[str]:
+        """
+        Store several memory entries, persisting them with a single log write.
+        
+        Args:
+            memory_entries: The memory entries to store
+            persist: Whether to save to persistent storage
+            
+        Returns:
+            List[str]: The IDs of the stored memory entries
+        """
+        with self.batch():
+            return [self.store(entry, persist) for entry in memory_entries]
+    
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Group stores into one persistent write, flushed when the block exits.
+        
+        Entries stored more than once inside the block are written once,
+        in their final state. Other threads' stores wait until the block exits.
+        """
+        with self._lock:
+            if self._pending is not None:
+                # Already batching; the outermost block flushes
+                yield
+                return
+            
+            self._pending = {}
+            try:
+                yield
+            finally:
+                pending, self._pending = self._pending, None
+                if pending:
+                    self._persist_to_storage(list(pending.values()))
+    
     def retrieve(self, entry_id: str) -> Optional[MemoryEntry]:
         """
         Retrieve a memory entry by ID, checking short-term memory first, then long-term.
@@ -144,20 +400,11 @@ class MemoryManager:
             return self._short_term_memory[entry_id]
         
         # Then check long-term memory
-        try:
-            with open(self._memory_file, 'r') as f:
-                memory_data = json.load(f)
-                
-            if entry_id in memory_data:
-                entry = MemoryEntry.from_dict(memory_data[entry_id])
-                # Cache in short-term for future access
-                self._short_term_memory[entry_id] = entry
-                return entry
-                
-        except (json.JSONDecodeError, FileNotFoundError) as e:
-            logging.error(f"Error retrieving from memory: {e}")
-            
-        return None
+        entry = self._all_entries.get(entry_id)
+        if entry is not None:
+            # Cache in short-term for future access
+            self._short_term_memory[entry_id] = entry
+        return entry
     
     def search(self, 
                query: str = None, 
@@ -176,64 +423,88 @@ class MemoryManager:
         Returns:
             List[MemoryEntry]: List of matching memory entries
         """
-        logging.info(f"Searching memory for: '{query}', limit={limit}")
+        logging.info("Searching memory for: '%s', limit=%s", query, limit)
         
-        # Load all entries from persistent storage
-        try:
-            with open(self._memory_file, 'r') as f:
-                memory_data = json.load(f)
-                
-            # Convert to memory entries
-            entries = []
-            for entry_id, entry_data in memory_data.items():
-                # Also include short-term entries that might have updated data
-                if entry_id in self._short_term_memory:
-                    entries.append(self._short_term_memory[entry_id])
-                else:
-                    entries.append(MemoryEntry.from_dict(entry_data))
+        with self._lock:
+            return self._search(query, limit, sort_by, reverse, {})
+    
+    def multi_query(self, 
+                    queries: List[str], 
+                    limit: int = 10, 
+                    sort_by: str = 'timestamp', 
+                    reverse: bool = True) -> List[List[MemoryEntry]]:
+        """
+        Run several searches in one pass under a single lock acquisition.
+        
+        Args:
+            queries: Search strings, each filtering entries like search's query
+            limit: Maximum number of entries to return per query
+            sort_by: Field to sort results by (timestamp, id)
+            reverse: Whether to reverse the sort order (newest first if True)
             
-            logging.info(f"Loaded {len(entries)} entries from memory")
-                    
-            # Filter by query if provided
-            if query:
-                # Split query into individual search terms
-                search_terms = query.lower().split()
-                
-                # Prepare a set to track which entries match
-                matched_entries = []
-                
-                for entry in entries:
-                    # Check if any search term is in the prompt or metadata
-                    entry_text = entry.original_prompt.lower()
-                    if entry.enhanced_prompt:
-                        entry_text += " " + entry.enhanced_prompt.lower()
-                        
-                    # Add tags to searchable text
-                    tags = entry.metadata.get("tags", [])
-                    if tags:
-                        entry_text += " " + " ".join(tags).lower()
-                        
-                    # Check if any search term is in the entry text
-                    for term in search_terms:
-                        if term in entry_text:
-                            matched_entries.append(entry)
-                            break
-                
-                entries = matched_entries
-                logging.info(f"Filtered to {len(entries)} entries matching '{query}'")
-                
-            # Sort entries
-            if sort_by == 'timestamp':
-                entries.sort(key=lambda x: x.timestamp, reverse=reverse)
-            elif sort_by == 'id':
-                entries.sort(key=lambda x: x.id, reverse=reverse)
-                
-            # Limit results
-            return entries[:limit]
-                
-        except (json.JSONDecodeError, FileNotFoundError) as e:
-            logging.error(f"Error searching memory: {e}")
-            return []
+        Returns:
+            List[List[MemoryEntry]]: The matching entries of each query, in query order
+        """
+        logging.info("Searching memory for %s queries, limit=%s", len(queries), limit)
+        
+        with self._lock:
+            # Terms shared between queries are only resolved against the index once
+            term_matches: Dict[str, Set[str]] = {}
+            return [self._search(query, limit, sort_by, reverse, term_matches) for query in queries]
+    
+    def _search(self, 
+                query: Optional[str], 
+                limit: int, 
+                sort_by: str, 
+                reverse: bool, 
+                term_matches: Dict[str, Set[str]]) -> List[MemoryEntry]:
+        """Run one search with the lock held, reusing and filling the term -> entry IDs map."""
+        # Filter by query if provided
+        if query:
+            # Split query into individual search terms
+            search_terms = query.lower().split()
+        
+            # Collect entries whose prompt or tag text contains any search term
+            matched_ids: Set[str] = set()
+            for term in search_terms:
+                term_ids = term_matches.get(term)
+                if term_ids is None:
+                    term_ids = set()
+                    if _WORD_RE.fullmatch(term):
+                        # A plain word can only appear inside a single indexed token,
+                        # so narrow the tokens to check with the trigram index
+                        for token in self._tokens_containing(term):
+                            term_ids |= self._postings[token]
+                    else:
+                        # Terms with punctuation ("sci-fi") span tokens; match the text
+                        for entry_id, entry in self._all_entries.items():
+                            if term in entry.search_blob():
+                                term_ids.add(entry_id)
+                    term_matches[term] = term_ids
+                matched_ids |= term_ids
+        
+            # Keep storage order so ties and unsorted limits are deterministic
+            entries = [entry for entry_id, entry in self._all_entries.items() if entry_id in matched_ids]
+            logging.info("Filtered to %s entries matching '%s'", len(entries), query)
+        else:
+            entries = self._all_entries.values()
+        
+        # Select the top entries without sorting everything (same order as a stable sort)
+        if sort_by in ('timestamp', 'id'):
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            return select(limit, entries, key=operator.attrgetter(sort_by))
+        
+        # Limit results
+        return list(entries)[:limit]
+    
+    def count(self) -> int:
+        """
+        Count the stored memory entries without loading or sorting them.
+        
+        Returns:
+            int: Number of memory entries
+        """
+        return len(self._all_entries)
     
     def list_recent(self, limit: int = 5) -> List[MemoryEntry]:
         """
@@ -251,6 +522,9 @@ class MemoryManager:
         """
         Update a memory entry with new data.
         
+        The entry is modified in place in memory and persisted with a
+        single log append; the snapshot file is not read or rewritten.
+        
         Args:
             entry_id: The ID of the memory entry to update
             updates: Dictionary of fields to update
@@ -258,45 +532,99 @@ class MemoryManager:
         Returns:
             Optional[MemoryEntry]: The updated memory entry, or None if not found
         """
-        entry = self.retrieve(entry_id)
-        if not entry:
-            return None
+        with self._lock:
+            entry = self.retrieve(entry_id)
+            if not entry:
+                return None
             
-        # Update fields
-        for key, value in updates.items():
-            if hasattr(entry, key):
-                setattr(entry, key, value)
+            # Update fields
+            for key, value in updates.items():
+                if hasattr(entry, key):
+                    setattr(entry, key, value)
+            entry._search_blob = None
                 
-        # Store the updated entry
-        self.store(entry)
-        return entry
+            # Store the updated entry
+            self.store(entry)
+            return entry
     
-    def _persist_to_storage(self, memory_entry: MemoryEntry) -> None:
+    def _persist_to_storage(self, memory_entries: List[MemoryEntry]) -> None:
         """
-        Persist a memory entry to long-term storage.
+        Persist memory entries to long-term storage by appending them to the log.
         
         Args:
-            memory_entry: The memory entry to persist
+            memory_entries: The memory entries to persist
         """
         try:
-            # Load existing data
-            try:
-                with open(self._memory_file, 'r') as f:
-                    memory_data = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                memory_data = {}
-                
-            # Add or update the entry
-            memory_data[memory_entry.id] = memory_entry.to_dict()
+            records = b"".join(_dumps(entry.to_dict()) + b"\n" for entry in memory_entries)
             
-            # Save back to file
-            with open(self._memory_file, 'w') as f:
-                json.dump(memory_data, f, indent=2)
+            with self._storage_lock():
+                if self._log_fh is None:
+                    self._log_fh = open(self._log_file, 'ab', buffering=0)
+                self._log_fh.write(records)
+                log_size = self._log_fh.tell()
                 
-            logging.info(f"Saved memory entry {memory_entry.id} to {self._memory_file}")
+            logging.info("Saved %s memory entries to %s", len(memory_entries), self._log_file)
+            
+            if log_size > LOG_COMPACT_THRESHOLD:
+                self.compact()
                 
         except Exception as e:
-            logging.error(f"Error persisting memory: {e}")
+            logging.error("Error persisting memory: %s", e)
+    
+    def compact(self) -> None:
+        """Fold the log into the snapshot file and truncate the log."""
+        with self._lock, self._storage_lock():
+            # Rebuild from disk so entries logged by other processes are kept
+            memory_data = self._load_entries()
+            for entry_id, entry_data in memory_data.items():
+                if entry_id not in self._all_entries:
+                    entry = MemoryEntry.from_dict(entry_data)
+                    self._all_entries[entry_id] = entry
+                    self._index_entry(entry)
+                    self._version += 1
+            self._write_snapshot(memory_data)
+            self._truncate_log()
+        logging.info("Compacted memory log into %s", self._memory_file)
+    
+    @contextmanager
+    def _storage_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock on the datastore while writing to it."""
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        with open(self._lock_file, 'a') as lock_fh:
+            fcntl.flock(lock_fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_fh, fcntl.LOCK_UN)
+    
+    def _write_snapshot(self, memory_data: Dict[str, Dict]) -> None:
+        """
+        Replace the snapshot file atomically so a crash never leaves it torn.
+        
+        Args:
+            memory_data: Entry dictionaries keyed by entry ID
+        """
+        tmp_file = self._memory_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(_dumps(memory_data))
+        os.replace(tmp_file, self._memory_file)
+    
+    def _truncate_log(self) -> None:
+        """Empty the append-only log."""
+        if self._log_fh is not None:
+            self._log_fh.close()
+            self._log_fh = None
+        with open(self._log_file, 'wb'):
+            pass
+    
+    def close(self) -> None:
+        """Close the log file handle."""
+        with self._lock:
+            if self._log_fh is not None:
+                self._log_fh.close()
+                self._log_fh = None
     
     def clear_short_term(self) -> None:
         """Clear short-term memory"""
@@ -304,10 +632,17 @@ class MemoryManager:
     
     def clear_all(self) -> None:
         """Clear both short-term and long-term memory"""
-        self.clear_short_term()
-        with open(self._memory_file, 'w') as f:
-            json.dump({}, f)
-        logging.info(f"Cleared all memory in {self._memory_file}")
+        with self._lock:
+            self.clear_short_term()
+            self._all_entries = {}
+            self._postings = {}
+            self._entry_tokens = {}
+            self._trigrams = {}
+            self._version += 1
+            with self._storage_lock():
+                self._write_snapshot({})
+                self._truncate_log()
+        logging.info("Cleared all memory in %s", self._memory_file)
 
 
 # Singleton instance for global access
@@ -1,9 +1,15 @@
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Union
 
 from core.memory_manager import MemoryEntry, get_memory_manager
 from core.file_manager import get_file_manager
-from core.llm_enhancer import get_llm_enhancer
+
+# Number of process_query results kept, and how long (seconds) each stays valid
+QUERY_CACHE_SIZE = 128
+QUERY_CACHE_TTL = 30.0
 
 class MemoryQueryHandler:
     """
@@ -15,7 +21,23 @@ class MemoryQueryHandler:
         """Initialize the memory query handler."""
         self.memory_manager = get_memory_manager()
         self.file_manager = get_file_manager()
-        self.llm_enhancer = get_llm_enhancer()
+        self._llm_enhancer = None
+        # LRU of lowercased prompt -> (cached_at, memory version, result)
+        self._query_cache: "OrderedDict[str, Tuple[float, int, Tuple[List[Dict], str]]]" = OrderedDict()
+        # The handler is shared across threads; guards _query_cache
+        self._cache_lock = threading.Lock()
+    
+    @property
+    def llm_enhancer(self):
+        """The LLM enhancer, loaded on first use so plain memory lookups don't pay for it."""
+        if self._llm_enhancer is None:
+            from core.llm_enhancer import get_llm_enhancer
+            self._llm_enhancer = get_llm_enhancer()
+        return self._llm_enhancer
+    
+    @llm_enhancer.setter
+    def llm_enhancer(self, enhancer):
+        self._llm_enhancer = enhancer
     
     def process_query(self, prompt: str) -> Tuple[List[Dict], str]:
         """
@@ -24,9 +46,58 @@ class MemoryQueryHandler:
         Args:
             prompt: The user's memory query
             
+        Results are cached per prompt for QUERY_CACHE_TTL seconds, and
+        dropped as soon as the memory manager's entries change.
+        
         Returns:
             Tuple[List[Dict], str]: (memory entries as dicts, summary message)
         """
+        return self.process_queries([prompt])[0]
+    
+    def process_queries(self, prompts: List[str]) -> List[Tuple[List[Dict], str]]:
+        """
+        Process several memory-related queries, searching memory for all of them at once.
+        
+        Args:
+            prompts: The user's memory queries
+            
+        Results are cached per prompt like process_query's.
+        
+        Returns:
+            List[Tuple[List[Dict], str]]: (memory entries as dicts, summary message) per query
+        """
+        now = time.monotonic()
+        version = self.memory_manager.version
+        results: List[Optional[Tuple[List[Dict], str]]] = [None] * len(prompts)
+        
+        # Serve cached prompts; group the rest by cache key so each runs once
+        pending: "OrderedDict[str, List[int]]" = OrderedDict()
+        with self._cache_lock:
+            for i, prompt in enumerate(prompts):
+                key = prompt.lower()
+                cached = self._query_cache.get(key)
+                if cached is not None and cached[1] == version and now - cached[0] < QUERY_CACHE_TTL:
+                    self._query_cache.move_to_end(key)
+                    results[i] = cached[2]
+                else:
+                    pending.setdefault(key, []).append(i)
+        
+        if pending:
+            # Searches run outside the lock so concurrent queries don't serialize
+            fresh = self._run_queries([prompts[indices[0]] for indices in pending.values()])
+            with self._cache_lock:
+                for (key, indices), result in zip(pending.items(), fresh):
+                    self._query_cache[key] = (now, version, result)
+                    self._query_cache.move_to_end(key)
+                    for i in indices:
+                        results[i] = result
+                while len(self._query_cache) > QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+        
+        return [(list(result_entries), summary) for result_entries, summary in results]
+    
+    def _parse_query(self, prompt: str) -> Tuple[str, List[str], int, bool]:
+        """Parse a memory query into (search query, search terms, limit, reverse)."""
         # Parse the query to extract parameters
         query_params = self.llm_enhancer.parse_memory_query(prompt)
         
@@ -34,7 +105,7 @@ class MemoryQueryHandler:
         search_terms = query_params.get("search_terms", [])
         
         # Log the search terms
-        logging.info(f"Search terms: {search_terms}")
+        logging.info("Search terms: %s", search_terms)
         
         # For city/cities, add both forms
         for i, term in enumerate(search_terms):
@@ -45,21 +116,55 @@ class MemoryQueryHandler:
                 if "city" not in search_terms:
                     search_terms.append("city")
                     
-        # Create the search query
-        search_query = " ".join(set(search_terms)) if search_terms else ""
+        # Create the search query, deduplicated in a stable order
+        search_query = " ".join(dict.fromkeys(search_terms)) if search_terms else ""
         
         # Get limit and sort parameters
         limit = query_params.get("limit", 5)
-        reverse = query_params.get("reverse", True)
-        
-        # Search memory with the combined terms
-        memory_entries = self.memory_manager.search(
-            query=search_query,
-            limit=limit,
-            sort_by="timestamp",
-            reverse=reverse
+        reverse = bool(query_params.get("reverse", True))
+        
+        return search_query, search_terms, limit, reverse
+    
+    def _run_queries(self, prompts: List[str]) -> List[Tuple[List[Dict], str]]:
+        """Parse and run memory queries without consulting the result cache."""
+        parsed = [self._parse_query(prompt) for prompt in prompts]
+        
+        # Search memory with one multi_query per sort order, fetching up to the
+        # largest limit and trimming each query to its own
+        memory_entries: List[List[MemoryEntry]] = [[] for _ in parsed]
+        for reverse in (True, False):
+            indices = [i for i, (_, _, _, query_reverse) in enumerate(parsed) if query_reverse == reverse]
+            if not indices:
+                continue
+            found = self.memory_manager.multi_query(
+                [parsed[i][0] for i in indices],
+                limit=max(parsed[i][2] for i in indices),
+                sort_by="timestamp",
+                reverse=reverse
+            )
+            for i, entries in zip(indices, found):
+                memory_entries[i] = entries[:parsed[i][2]]
+        
+        # Look up every referenced file in one batched pass
+        file_info = self.file_manager.get_files_info(
+            path
+            for entries in memory_entries
+            for entry in entries
+            for path in (entry.image_path, entry.model_path)
+            if path
         )
         
+        return [
+            self._build_result(entries, search_query, search_terms, file_info)
+            for entries, (search_query, search_terms, _, _) in zip(memory_entries, parsed)
+        ]
+    
+    def _build_result(self, 
+                      memory_entries: List[MemoryEntry], 
+                      search_query: str, 
+                      search_terms: List[str], 
+                      file_info: Dict) -> Tuple[List[Dict], str]:
+        """Convert found entries to dictionaries and summarize them."""
         # Convert entries to dictionaries and add convenience fields
         result_entries = []
         for entry in memory_entries:
@@ -67,12 +172,12 @@ class MemoryQueryHandler:
             
             # Add convenience fields for the frontend
             if entry.image_path:
-                exists, size, _ = self.file_manager.get_file_info(entry.image_path)
+                exists, size, _ = file_info[entry.image_path]
                 entry_dict["image_exists"] = exists
                 entry_dict["image_size"] = size
                 
             if entry.model_path:
-                exists, size, _ = self.file_manager.get_file_info(entry.model_path)
+                exists, size, _ = file_info[entry.model_path]
                 entry_dict["model_exists"] = exists
                 entry_dict["model_size"] = size
                 
@@ -92,12 +197,14 @@ class MemoryQueryHandler:
         
         return result_entries, summary
     
-    def get_memory_content(self, memory_id: str) -> Optional[Dict]:
+    def get_memory_content(self, memory_id: str, encode: bool = True) -> Optional[Dict]:
         """
         Get full content for a specific memory entry, including binary data.
         
         Args:
             memory_id: ID of the memory entry
+            encode: Whether to base64-encode the binary data for a JSON response;
+                in-process callers can pass False to get raw bytes instead
             
         Returns:
             Optional[Dict]: Full memory entry with binary data if found
@@ -112,12 +219,12 @@ class MemoryQueryHandler:
         if entry.image_path:
             image_data = self.file_manager.load_file(entry.image_path)
             if image_data:
-                result["image_data"] = self.file_manager.encode_to_base64(image_data)
+                result["image_data"] = self.file_manager.encode_to_base64(image_data) if encode else image_data
                 
         if entry.model_path:
             model_data = self.file_manager.load_file(entry.model_path)
             if model_data:
-                result["model_data"] = self.file_manager.encode_to_base64(model_data)
+                result["model_data"] = self.file_manager.encode_to_base64(model_data) if encode else model_data
                 
         return result
     
@@ -137,20 +244,20 @@ class MemoryQueryHandler:
             return None
             
         # Get existing tags or create new list
-        existing_tags = entry.metadata.get("tags", [])
+        existing_tags = list(entry.metadata.get("tags", []))
+        seen = set(existing_tags)
         
-        # Add new tags (avoid duplicates)
+        # Add new tags (avoid duplicates), keeping their order
         for tag in tags:
-            if tag not in existing_tags:
+            if tag not in seen:
+                seen.add(tag)
                 existing_tags.append(tag)
                 
         # Update metadata
-        if "metadata" not in entry.metadata:
-            entry.metadata = {}
         entry.metadata["tags"] = existing_tags
         
-        # Save the updated entry
-        self.memory_manager.store(entry)
+        # Save the updated entry in place with a single log append
+        entry = self.memory_manager.update(memory_id, {"metadata": entry.metadata})
         
         return entry.to_dict()
 
@@ -3,27 +3,120 @@ Real LLM Enhancer that uses DeepSeek to enhance prompts.
 This replaces the simulated LLM enhancer with a real model.
 """
 
+import atexit
+import copy
+import gc
+import hashlib
+import json
 import logging
 import os
-import torch
-from typing import Dict, List, Optional
-from transformers import AutoModelForCausalLM, AutoTokenizer
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Import orjson conditionally; stdlib json is the fallback codec for the prompt cache
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# torch, transformers and vllm take seconds to import, so they are loaded
+# when the first enhancer is created rather than when this module is imported
+torch = None
+AutoModelForCausalLM = AutoTokenizer = BitsAndBytesConfig = None
+LLM = SamplingParams = None
+VLLM_AVAILABLE: Optional[bool] = None
+
+def _import_torch() -> None:
+    """Import torch and transformers into the module namespace on first use."""
+    global torch, AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
+    if torch is None:
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
+
+def _import_vllm() -> bool:
+    """Import vllm on first use, returning whether it is available."""
+    global LLM, SamplingParams, VLLM_AVAILABLE
+    if VLLM_AVAILABLE is None:
+        # Import vllm conditionally so the transformers backend works without it
+        try:
+            from vllm import LLM, SamplingParams
+            VLLM_AVAILABLE = True
+        except ImportError:
+            VLLM_AVAILABLE = False
+    return VLLM_AVAILABLE
+
+# Checkpoint and weight quantization used by get_real_llm_enhancer; point CF_LLM_MODEL
+# at a lighter or pre-quantized (GPTQ/AWQ) checkpoint to cut memory further
+LLM_MODEL = os.getenv("CF_LLM_MODEL", "deepseek-ai/deepseek-coder-6.7b-instruct")
+LLM_USE_4BIT = os.getenv("CF_LLM_4BIT", "1") == "1"
+LLM_BACKEND = os.getenv("CF_LLM_BACKEND", "hf")
+
+# Number of enhanced prompts remembered by prompt hash (0 disables the cache)
+PROMPT_CACHE_SIZE = 1024
+
+# Newly enhanced prompts that trigger a rewrite of the saved prompt cache
+PROMPT_CACHE_SAVE_EVERY = 16
+
+def _prompt_key(model_name: str, prompt: str) -> str:
+    """Return the cache key for a prompt enhanced by the given model."""
+    # Prompts differing only in whitespace (e.g. a trailing newline from a text area) share a key
+    prompt = " ".join(prompt.split())
+    return hashlib.blake2b(f"{model_name}\0{prompt}".encode('utf-8'), digest_size=16).hexdigest()
 
 class DeepSeekLLMEnhancer:
     """
     Real LLM enhancer that uses DeepSeek to enhance and expand user prompts.
     
     Attributes:
-        model: The DeepSeek language model
-        tokenizer: The tokenizer for the model
+        model: The DeepSeek language model (transformers backend)
+        tokenizer: The tokenizer for the model (transformers backend)
+        llm: The vLLM engine (vllm backend)
         device: The device to run the model on (cuda or cpu)
     """
     
+    # Single-word and multi-word keywords that signal a memory query
+    MEMORY_KEYWORDS: FrozenSet[str] = frozenset({
+        "find", "retrieve", "get", "recall", "remember", "previous",
+        "earlier", "last", "any", "all"
+    })
+    MEMORY_PHRASES = ("show me", "like before", "like last time", "search for", "look for")
+    
+    # All memory keywords compiled into one alternation so a prompt is scanned once
+    MEMORY_QUERY_RE = re.compile(
+        r"\b(?:" + "|".join(map(re.escape, MEMORY_PHRASES + tuple(sorted(MEMORY_KEYWORDS)))) + r")\b"
+    )
+    
+    # System message explaining the task; identical for every request
+    SYSTEM_MESSAGE = """You are a creative prompt engineer for image generation. 
+Your task is to enhance user prompts with descriptive details to make them more 
+visually compelling. Add descriptive details, artistic style, lighting, and composition 
+information that would make the image more vivid and detailed. Your enhanced prompt 
+should be 2-3 times longer than the original prompt."""
+    
+    # Words that introduce an explicit search term ("like dragons")
+    SEARCH_TERM_MARKERS: FrozenSet[str] = frozenset({"like", "about", "with", "containing"})
+    
+    # Words ignored when extracting keywords from a memory query
+    COMMON_WORDS: FrozenSet[str] = frozenset({
+        "show", "me", "find", "get", "the", "a", "an", "in", "on", "with", "and", "or", "my"
+    })
+    
     def __init__(
         self, 
         model_name_or_path: str = "deepseek-ai/deepseek-coder-6.7b-instruct",
         device: Optional[str] = None,
-        use_4bit: bool = True  # Use 4-bit quantization for memory efficiency
+        use_4bit: bool = True,  # Use 4-bit quantization for memory efficiency
+        backend: str = "hf",
+        cache_size: int = PROMPT_CACHE_SIZE,
+        cache_file: Optional[str] = None
     ):
         """
         Initialize the DeepSeek LLM enhancer.
@@ -32,17 +125,66 @@ class DeepSeekLLMEnhancer:
             model_name_or_path: The model name or path to load
             device: The device to use for inference (cuda or cpu)
             use_4bit: Whether to use 4-bit quantization
+            backend: "vllm" for PagedAttention with continuous batching, or "hf" for transformers
+            cache_size: Enhanced prompts to remember; when non-zero, decoding is greedy
+                so a cached result is what regenerating would return
+            cache_file: Where the prompt cache is saved every PROMPT_CACHE_SAVE_EVERY
+                new prompts and at exit (defaults to the datastore)
         """
+        _import_torch()
         self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
-        logging.info(f"Initializing DeepSeek LLM on {self.device}")
+        logger.info("Initializing DeepSeek LLM on %s", self.device)
         
+        if backend == "vllm" and not (self.device == 'cuda' and _import_vllm()):
+            logger.warning("vllm backend unavailable, falling back to transformers")
+            backend = "hf"
+        self.backend = backend
+        self.llm = None
+        self.model = None
+        self.tokenizer = None
+        
+        # LRU of (model, prompt) hash -> enhanced prompt, persisted across restarts
+        self._model_name = model_name_or_path
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        # New entries not yet written to the cache file
+        self._unsaved = 0
+        if cache_file is None:
+            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cache_file = os.path.join(app_dir, 'datastore', 'prompt_cache.json')
+        self._cache_file = cache_file
+        if cache_size > 0:
+            self._load_cache()
+            atexit.register(self.save_cache)
+        
+        if backend == "vllm":
+            logger.info("Using vllm backend")
+            # Automatic prefix caching reuses the system message's KV blocks across requests
+            self.llm = LLM(model=model_name_or_path, dtype="bfloat16", enable_prefix_caching=True)
+        else:
+            self._load_hf_model(model_name_or_path, use_4bit)
+        
+        # Test the model with a simple prompt
+        logger.info("Testing DeepSeek model with a simple prompt")
+        self._test_model()
+    
+    def _load_hf_model(self, model_name_or_path: str, use_4bit: bool):
+        """Load the model and tokenizer for the transformers backend."""
         if use_4bit and self.device == 'cuda':
-            # Use 4-bit quantization for memory efficiency
-            logging.info("Using 4-bit quantization")
+            # Use NF4 4-bit weights with bf16 compute for memory efficiency and speed
+            logger.info("Using 4-bit NF4 quantization")
+            quantization_config = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=torch.bfloat16,
+                bnb_4bit_use_double_quant=True
+            )
             self.model = AutoModelForCausalLM.from_pretrained(
                 model_name_or_path,
-                torch_dtype=torch.float16,
-                load_in_4bit=True,
+                torch_dtype=torch.bfloat16,
+                quantization_config=quantization_config,
                 device_map="auto"
             )
         else:
@@ -54,19 +196,39 @@ class DeepSeekLLMEnhancer:
             if self.device != 'cuda':
                 self.model.to(self.device)
         
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name_or_path)
+        # Inference only: disable dropout and reuse the KV cache across decode steps
+        self.model.eval()
+        self.model.config.use_cache = True
         
-        # Test the model with a simple prompt
-        logging.info("Testing DeepSeek model with a simple prompt")
-        self._test_model()
+        # Pad on the left so every prompt in a batch ends where generation starts
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name_or_path, padding_side="left")
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        
+        self._build_prefix_cache()
+    
+    def _build_prefix_cache(self):
+        """Precompute the KV cache for the system message shared by every instruction."""
+        self._prefix_ids = None
+        self._prefix_kv = None
+        try:
+            prefix_ids = self.tokenizer(self.SYSTEM_MESSAGE, return_tensors="pt").input_ids.to(self.device)
+            # Leave off the last token, which may merge with the text that follows it
+            prefix_ids = prefix_ids[:, :-1]
+            with torch.inference_mode():
+                self._prefix_kv = self.model(prefix_ids, use_cache=True).past_key_values
+            self._prefix_ids = prefix_ids
+        except Exception as e:
+            logger.warning("Could not precompute system prompt cache: %s", e)
     
     def _test_model(self):
         """Test the model with a simple prompt."""
         try:
-            result = self.enhance_prompt("A cat")
-            logging.info(f"Test result: {result}")
+            # A short greedy run is enough to warm up; bypass the prompt cache
+            result = self._enhance_uncached(["A cat"], max_new_tokens=32, greedy=True)[0]
+            logger.info("Test result: %s", result)
         except Exception as e:
-            logging.error(f"Error testing model: {e}")
+            logger.error("Error testing model: %s", e)
     
     def enhance_prompt(self, prompt: str) -> str:
         """
@@ -78,44 +240,191 @@ class DeepSeekLLMEnhancer:
         Returns:
             str: Enhanced prompt with additional details
         """
-        # Create a system message explaining the task
-        system_message = """You are a creative prompt engineer for image generation. 
-Your task is to enhance user prompts with descriptive details to make them more 
-visually compelling. Add descriptive details, artistic style, lighting, and composition 
-information that would make the image more vivid and detailed. Your enhanced prompt 
-should be 2-3 times longer than the original prompt."""
-
-        # Create the user message
-        user_message = f"Here is my image prompt: \"{prompt}\"\nPlease enhance it to create a more vivid and detailed image."
+        return self.enhance_prompts([prompt])[0]
+    
+    def enhance_prompts(self, prompts: List[str]) -> List[str]:
+        """
+        Enhance several user prompts with one batched generate call.
+        
+        Args:
+            prompts: The users' original prompts
+            
+        Returns:
+            List[str]: Enhanced prompts, in the same order as the input
+        """
+        if not prompts:
+            return []
         
-        # Combine into a proper instruction format for DeepSeek
-        instruction = f"{system_message}\n\nUser: {user_message}\n\nAssistant:"
+        if self._cache_size <= 0:
+            return self._enhance_uncached(prompts)
         
-        # Generate the response
-        logging.info(f"Enhancing prompt: {prompt}")
-        inputs = self.tokenizer(instruction, return_tensors="pt").to(self.device)
+        # Only generate for prompts that are not cached, each at most once
+        keys = [_prompt_key(self._model_name, prompt) for prompt in prompts]
+        results: Dict[str, str] = {}
+        misses: Dict[str, str] = {}
+        with self._cache_lock:
+            for key, prompt in zip(keys, prompts):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    results[key] = cached
+                elif key not in misses:
+                    misses[key] = prompt
         
-        with torch.no_grad():
-            outputs = self.model.generate(
-                **inputs,
-                max_new_tokens=256,
-                temperature=0.7,
-                top_p=0.9,
-                do_sample=True
-            )
+        if misses:
+            # Cached results must be reproducible, so decode greedily
+            enhanced = self._enhance_uncached(list(misses.values()), greedy=True)
+            with self._cache_lock:
+                for key, enhanced_prompt in zip(misses, enhanced):
+                    results[key] = enhanced_prompt
+                    self._cache[key] = enhanced_prompt
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+                self._unsaved += len(misses)
+                save = self._unsaved >= PROMPT_CACHE_SAVE_EVERY
+            # Rewriting the whole file is O(cache size), so only save every few new prompts
+            if save:
+                self.save_cache()
+        
+        return [results[key] for key in keys]
+    
+    def _enhance_uncached(
+        self,
+        prompts: List[str],
+        max_new_tokens: int = 256,
+        greedy: bool = False
+    ) -> List[str]:
+        """
+        Run the model over a batch of prompts.
         
-        # Decode the response
-        response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        Args:
+            prompts: The users' original prompts
+            max_new_tokens: Maximum number of tokens to generate per prompt
+            greedy: Decode greedily instead of sampling
+            
+        Returns:
+            List[str]: Enhanced prompts, in the same order as the input
+        """
+        # Combine each user message into a proper instruction format for DeepSeek
+        instructions = []
+        for prompt in prompts:
+            user_message = f"Here is my image prompt: \"{prompt}\"\nPlease enhance it to create a more vivid and detailed image."
+            instructions.append(f"{self.SYSTEM_MESSAGE}\n\nUser: {user_message}\n\nAssistant:")
         
-        # Extract just the enhanced prompt part
-        enhanced_prompt = response.split("Assistant:")[-1].strip()
+        logger.info("Enhancing %d prompt(s)", len(prompts))
+        if self.llm is not None:
+            # vllm schedules the batch itself and returns only the completions
+            if greedy:
+                sampling_params = SamplingParams(temperature=0.0, max_tokens=max_new_tokens)
+            else:
+                sampling_params = SamplingParams(temperature=0.7, top_p=0.9, max_tokens=max_new_tokens)
+            outputs = self.llm.generate(instructions, sampling_params)
+            responses = [output.outputs[0].text for output in outputs]
+        else:
+            responses = self._generate_hf(instructions, max_new_tokens, greedy)
         
-        # Clean up the response: sometimes models add quotes or "Enhanced prompt:" prefix
-        enhanced_prompt = enhanced_prompt.replace("Enhanced prompt:", "").strip()
-        enhanced_prompt = enhanced_prompt.strip('"\'')
+        enhanced_prompts = []
+        for prompt, response in zip(prompts, responses):
+            # Extract just the enhanced prompt part
+            enhanced_prompt = response.split("Assistant:")[-1].strip()
+            
+            # Clean up the response: sometimes models add quotes or "Enhanced prompt:" prefix
+            enhanced_prompt = enhanced_prompt.replace("Enhanced prompt:", "").strip()
+            enhanced_prompt = enhanced_prompt.strip('"\'')
+            
+            logger.info("Enhanced prompt: %s -> %s", prompt, enhanced_prompt)
+            enhanced_prompts.append(enhanced_prompt)
         
-        logging.info(f"Enhanced prompt: {prompt} -> {enhanced_prompt}")
-        return enhanced_prompt
+        return enhanced_prompts
+    
+    def _generate_hf(self, instructions: List[str], max_new_tokens: int, greedy: bool) -> List[str]:
+        """Generate responses for a batch of instructions with transformers."""
+        # Generate all responses in one padded batch
+        inputs = self.tokenizer(
+            instructions,
+            return_tensors="pt",
+            padding=True,
+            truncation=True
+        ).to(self.device)
+        
+        if greedy:
+            sampling = {"do_sample": False, "num_beams": 1}
+        else:
+            sampling = {"do_sample": True, "temperature": 0.7, "top_p": 0.9}
+        
+        generate_kwargs = dict(
+            inputs,
+            max_new_tokens=max_new_tokens,
+            pad_token_id=self.tokenizer.pad_token_id,
+            **sampling
+        )
+        
+        # A single unpadded instruction can start from the cached system prefix
+        outputs = None
+        input_ids = inputs["input_ids"]
+        if self._prefix_kv is not None and input_ids.shape[0] == 1:
+            prefix_len = self._prefix_ids.shape[1]
+            if input_ids.shape[1] > prefix_len and torch.equal(input_ids[0, :prefix_len], self._prefix_ids[0]):
+                try:
+                    # inference_mode skips the autograd bookkeeping no_grad still does
+                    with torch.inference_mode():
+                        outputs = self.model.generate(
+                            past_key_values=copy.deepcopy(self._prefix_kv),
+                            **generate_kwargs
+                        )
+                except Exception as e:
+                    logger.warning("Generation from cached prefix failed, retrying without it: %s", e)
+        
+        if outputs is None:
+            with torch.inference_mode():
+                outputs = self.model.generate(**generate_kwargs)
+        
+        # Decode the responses
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    
+    def _load_cache(self):
+        """Load previously saved enhanced prompts, if any."""
+        try:
+            with open(self._cache_file, 'rb') as f:
+                data = f.read()
+            saved = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable prompt cache %s: %s", self._cache_file, e)
+            return
+        for key, enhanced_prompt in list(saved.items())[-self._cache_size:]:
+            self._cache[key] = enhanced_prompt
+    
+    def save_cache(self):
+        """Write the prompt cache to disk if it changed, replacing the previous file atomically."""
+        # One save at a time, so saves never share the temporary file or land out of order
+        with self._save_lock:
+            with self._cache_lock:
+                if not self._unsaved:
+                    return
+                self._unsaved = 0
+                data = orjson.dumps(self._cache) if ORJSON_AVAILABLE else json.dumps(self._cache).encode('utf-8')
+            try:
+                os.makedirs(os.path.dirname(self._cache_file), exist_ok=True)
+                tmp_file = self._cache_file + '.tmp'
+                with open(tmp_file, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_file, self._cache_file)
+            except OSError as e:
+                logger.error("Error saving prompt cache: %s", e)
+    
+    def close(self):
+        """Save the prompt cache and drop the model, so its (GPU) memory can be freed."""
+        if self._cache_size > 0:
+            self.save_cache()
+            atexit.unregister(self.save_cache)
+        self.llm = None
+        self.model = None
+        self.tokenizer = None
+        self._prefix_ids = None
+        self._prefix_kv = None
     
     def is_memory_query(self, prompt: str) -> bool:
         """
@@ -127,13 +436,7 @@ should be 2-3 times longer than the original prompt."""
         Returns:
             bool: True if this is a memory query, False otherwise
         """
-        memory_keywords = [
-            "show me", "find", "retrieve", "get", "recall", "remember", 
-            "like before", "like last time", "previous", "earlier", "last",
-            "search for", "look for", "any", "all"
-        ]
-        
-        return any(keyword in prompt.lower() for keyword in memory_keywords)
+        return self.MEMORY_QUERY_RE.search(prompt.lower()) is not None
     
     def parse_memory_query(self, prompt: str) -> Dict:
         """
@@ -158,8 +461,9 @@ should be 2-3 times longer than the original prompt."""
         
         # Extract search terms (simple approach - could be more sophisticated)
         words = query.split()
-        for i, word in enumerate(words):
-            if word in ["like", "about", "with", "containing"] and i < len(words) - 1:
+        word_set = set(words)
+        for i, word in enumerate(words[:-1]):
+            if word in self.SEARCH_TERM_MARKERS:
                 result["search_terms"].append(words[i+1])
                 
         # Look for time-related terms
@@ -169,15 +473,15 @@ should be 2-3 times longer than the original prompt."""
             result["reverse"] = False
             
         # Look for count terms
-        if "last" in query and any(word.isdigit() for word in words):
-            for i, word in enumerate(words):
-                if word == "last" and i < len(words) - 1 and words[i+1].isdigit():
+        if "last" in word_set:
+            for i, word in enumerate(words[:-1]):
+                if word == "last" and words[i+1].isdigit():
                     result["limit"] = int(words[i+1])
         
         # If no specific search terms, extract potential keywords
         if not result["search_terms"]:
             # Remove common words
-            common_words = ["show", "me", "find", "get", "the", "a", "an", "in", "on", "with", "and", "or", "my"]
+            common_words = self.COMMON_WORDS
             filtered_words = [w for w in words if w not in common_words and len(w) > 3]
             
             # Handle plural/singular forms
@@ -193,6 +497,120 @@ should be 2-3 times longer than the original prompt."""
         return result
 
 
+# Most prompts BatchingEnhancer sends in one call, and how long (seconds) it
+# waits for more prompts to join a batch after the first arrives
+BATCH_MAX_SIZE = 8
+BATCH_MAX_WAIT = 0.02
+
+class BatchingEnhancer:
+    """
+    Coalesces prompts submitted concurrently (e.g. by several Streamlit sessions)
+    into batched enhance_prompts calls, so they share generate passes.
+    """
+    
+    def __init__(self, enhancer, max_batch_size: int = BATCH_MAX_SIZE, max_wait: float = BATCH_MAX_WAIT):
+        """
+        Start the background thread that batches prompts for the given enhancer.
+        
+        Args:
+            enhancer: The enhancer to call; uses its enhance_prompts method if it has one
+            max_batch_size: Most prompts sent in one call
+            max_wait: Seconds to wait for more prompts after the first of a batch arrives
+        """
+        self._enhancer = enhancer
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        # (prompt, future) pairs; None asks the thread to stop
+        self._queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        # Guards _closed so no prompt is queued behind the stop sentinel
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="enhance-batcher", daemon=True)
+        self._thread.start()
+    
+    def submit(self, prompt: str) -> "Future[str]":
+        """
+        Queue a prompt for enhancement.
+        
+        Args:
+            prompt: The user's original prompt
+            
+        Returns:
+            Future[str]: Resolves to the enhanced prompt, or to the enhancer's exception
+                (a RuntimeError once the batcher is closed)
+        """
+        future: "Future[str]" = Future()
+        with self._lock:
+            if not self._closed:
+                self._queue.put((prompt, future))
+                return future
+        future.set_exception(RuntimeError("BatchingEnhancer is closed"))
+        return future
+    
+    def enhance_prompt(self, prompt: str) -> str:
+        """Enhance a prompt, waiting for the batch it joins."""
+        return self.submit(prompt).result()
+    
+    def close(self) -> None:
+        """Stop the background thread once the queued prompts are enhanced."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._thread.join()
+    
+    def _run(self) -> None:
+        """Collect prompts into batches and enhance them until closed."""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._enhance_batch(batch)
+        # Fail anything left behind the sentinel rather than leave it unresolved
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("BatchingEnhancer is closed"))
+    
+    def _enhance_batch(self, batch: List[Tuple[str, Future]]) -> None:
+        """Enhance one batch and resolve its futures."""
+        # Skip prompts whose callers cancelled while they were queued
+        batch = [(prompt, future) for prompt, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        prompts = [prompt for prompt, _ in batch]
+        try:
+            enhance_prompts = getattr(self._enhancer, "enhance_prompts", None)
+            if enhance_prompts is not None:
+                results = enhance_prompts(prompts)
+            else:
+                results = [self._enhancer.enhance_prompt(prompt) for prompt in prompts]
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
 # Singleton instance for global access
 _llm_enhancer = None
 
@@ -200,5 +618,20 @@ def get_real_llm_enhancer() -> DeepSeekLLMEnhancer:
     """Get or create the singleton LLM enhancer instance"""
     global _llm_enhancer
     if _llm_enhancer is None:
-        _llm_enhancer = DeepSeekLLMEnhancer()
-    return _llm_enhancer
\ No newline at end of file
+        _llm_enhancer = DeepSeekLLMEnhancer(
+            model_name_or_path=LLM_MODEL,
+            use_4bit=LLM_USE_4BIT,
+            backend=LLM_BACKEND
+        )
+    return _llm_enhancer
+
+def release_real_llm_enhancer() -> None:
+    """Close the singleton LLM enhancer, if loaded, and return its memory to the system"""
+    global _llm_enhancer
+    if _llm_enhancer is None:
+        return
+    _llm_enhancer.close()
+    _llm_enhancer = None
+    gc.collect()
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
@@ -40,6 +40,19 @@ class Remote:
         self.client = Proxy(self.proxy_url, self.proxy_tag, ssl_verify=False)
         return self
 
+    # ----------------------------------------------------------------------
+    def close(self) -> None:
+        """
+        Closes the proxy connection, if the client supports it, and drops the client.
+        """
+        if self.client is None:
+            return
+
+        close = getattr(self.client, "close", None)
+        if callable(close):
+            close()
+        self.client = None
+
     # ----------------------------------------------------------------------
     def execute(self, inputs: dict, uid: str) -> Union[ExecutionResult, None]:
         """
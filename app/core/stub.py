@@ -1,11 +1,19 @@
+import asyncio
+import functools
 import json
 import logging
+import os
 import pprint
-from typing import Any, Dict, List, Literal, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 # Import requests conditionally to allow testing without it
 try:
     import requests
+    from requests.adapters import HTTPAdapter
     REQUESTS_AVAILABLE = True
 except ImportError:
     REQUESTS_AVAILABLE = False
@@ -19,65 +27,219 @@ Manifests = Dict[str, dict]
 Schemas = Dict[str, Tuple[dict, dict]]
 Connections = Dict[str, Remote]
 
+# Read-only mock metadata shared by every app that has no reachable API
+_MOCK_MANIFEST_TMPL = "Mock App {}"
+_MOCK_INPUT_SCHEMA = MappingProxyType({"type": "object", "properties": {"prompt": {"type": "string"}}})
+_MOCK_OUTPUT_SCHEMA = MappingProxyType({"type": "object", "properties": {"result": {"type": "string"}}})
+
+# Mock payloads returned by call(), decoded once at import
+# A 1x1 transparent PNG for the Text-to-Image app
+_MOCK_PNG_BYTES = bytes.fromhex('89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c4890000000d4944415478da6364000002000001010901b10000000049454e44ae426082')
+# A minimal GLB file for the Image-to-3D app
+_MOCK_GLB_BYTES = bytes.fromhex('676c5446020000000c0000004a534f4e7b22617373657473223a5b5d7d00')
+_MOCK_RESULTS: Dict[str, bytes] = {
+    "f0997a01-d6d3-a5fe-53d8-561300318557": _MOCK_PNG_BYTES,  # Text-to-Image
+    "69543f29-4d41-4afc-7f29-3d51591f11eb": _MOCK_GLB_BYTES,  # Image-to-3D
+}
+
+# Serve mock results instead of calling the apps unless CF_MOCK=0 is set
+MOCK_MODE = os.getenv("CF_MOCK", "1") == "1"
+
+# Upper bound on concurrent manifest/schema fetches
+MAX_FETCH_WORKERS = 32
+
+# Shared session so manifest/schema fetches reuse pooled keep-alive connections
+if REQUESTS_AVAILABLE:
+    _SESSION = requests.Session()
+    _SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+
+
+# How long (seconds) fetched manifests/schemas are reused before revalidating
+METADATA_CACHE_TTL = 3600.0
+
+# Cache of url -> (fetched_at, etag, document), shared by every Stub in the process
+_METADATA_CACHE: Dict[str, Tuple[float, Optional[str], dict]] = {}
+
+
+def _get_json(url: str) -> Optional[dict]:
+    """
+    Fetch a JSON document, returning None if the request or decoding fails.
+    Documents are reused for METADATA_CACHE_TTL, then revalidated with their ETag.
+    """
+    now = time.monotonic()
+    cached = _METADATA_CACHE.get(url)
+    if cached is not None and now - cached[0] < METADATA_CACHE_TTL:
+        return cached[2]
+
+    headers = {"If-None-Match": cached[1]} if cached is not None and cached[1] else None
+    try:
+        response = _SESSION.get(url, timeout=5, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            # Unchanged on the server; keep using the cached document
+            document = cached[2]
+            etag = response.headers.get("ETag", cached[1])
+        else:
+            document = response.json()
+            etag = response.headers.get("ETag")
+    except (requests.RequestException, ValueError) as e:
+        logging.warning("Fetching %s failed: %s", url, e)
+        return None
+
+    _METADATA_CACHE[url] = (now, etag, document)
+    return document
+
 
 class Stub:
     """
     Stub acts as a lightweight client interface that initializes remote connections
     to multiple Openfabric applications, fetching their manifests, schemas, and enabling
-    execution of calls to these apps.
+    execution of calls to these apps. Metadata and connections are loaded on first use.
 
     Attributes:
         _schema (Schemas): Stores input/output schemas for each app ID.
         _manifest (Manifests): Stores manifest metadata for each app ID.
         _connections (Connections): Stores active Remote connections for each app ID.
+        _mock_mode (bool): Whether call() returns mock results instead of calling the apps.
+        _output_marshmallow (Dict[str, Tuple[Any, bool]]): Output marshmallow schema of each
+            called app, and whether it has resource fields.
     """
 
     # ----------------------------------------------------------------------
     def __init__(self, app_ids: List[str]):
         """
-        Initializes the Stub instance by loading manifests, schemas, and connections
-        for each given app ID.
+        Initializes the Stub instance for the given app IDs. Manifests, schemas and
+        connections are loaded lazily, on first use.
 
         Args:
             app_ids (List[str]): A list of application identifiers (hostnames or URLs).
         """
+        self._app_ids: List[str] = list(dict.fromkeys(app_ids))
         self._schema: Schemas = {}
         self._manifest: Manifests = {}
         self._connections: Connections = {}
+        self._lock = threading.Lock()
+        self._mock_mode: bool = not REQUESTS_AVAILABLE or MOCK_MODE
+        self._output_marshmallow: Dict[str, Tuple[Any, bool]] = {}
 
-        for app_id in app_ids:
-            base_url = app_id.strip('/')
+    # ----------------------------------------------------------------------
+    def _ensure_loaded(self, app_id: str) -> None:
+        """
+        Loads the manifest and schemas for an app the first time they are needed.
+        Every app not loaded yet is fetched in the same concurrent batch.
 
-            try:
-                if REQUESTS_AVAILABLE:
-                    # Fetch manifest from real API
-                    try:
-                        manifest = requests.get(f"https://{base_url}/manifest", timeout=5).json()
-                        input_schema = requests.get(f"https://{base_url}/schema?type=input", timeout=5).json()
-                        output_schema = requests.get(f"https://{base_url}/schema?type=output", timeout=5).json()
-                    except:
-                        # Fall back to mock data if API call fails
-                        manifest = {"name": f"Mock App {app_id}", "version": "1.0.0"}
-                        input_schema = {"type": "object", "properties": {"prompt": {"type": "string"}}}
-                        output_schema = {"type": "object", "properties": {"result": {"type": "string"}}}
+        Args:
+            app_id (str): The application ID whose metadata is needed.
+        """
+        if app_id in self._schema or app_id not in self._app_ids:
+            return
+
+        with self._lock:
+            pending = [pending_id for pending_id in self._app_ids if pending_id not in self._schema]
+            if not pending:
+                return
+
+            # Fetch every pending app's manifest and schemas concurrently
+            fetched: List[Optional[dict]] = []
+            if REQUESTS_AVAILABLE:
+                urls = []
+                for pending_id in pending:
+                    base_url = pending_id.strip('/')
+                    urls += [
+                        f"https://{base_url}/manifest",
+                        f"https://{base_url}/schema?type=input",
+                        f"https://{base_url}/schema?type=output",
+                    ]
+                with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(urls))) as executor:
+                    fetched = list(executor.map(_get_json, urls))
+
+            for i, pending_id in enumerate(pending):
+                documents = fetched[3 * i:3 * i + 3]
+                if documents and None not in documents:
+                    manifest, input_schema, output_schema = documents
                 else:
-                    # Use mock data for testing
-                    manifest = {"name": f"Mock App {app_id}", "version": "1.0.0"}
-                    input_schema = {"type": "object", "properties": {"prompt": {"type": "string"}}}
-                    output_schema = {"type": "object", "properties": {"result": {"type": "string"}}}
-                
-                logging.info(f"[{app_id}] Manifest loaded: {manifest}")
-                self._manifest[app_id] = manifest
-                
-                logging.info(f"[{app_id}] Input schema loaded: {input_schema}")
-                logging.info(f"[{app_id}] Output schema loaded: {output_schema}")
-                self._schema[app_id] = (input_schema, output_schema)
-
-                # Establish Remote WebSocket connection
-                self._connections[app_id] = Remote(f"wss://{base_url}/app", f"{app_id}-proxy").connect()
-                logging.info(f"[{app_id}] Connection established.")
+                    # Use mock data for testing, or if the API call failed
+                    manifest = {"name": _MOCK_MANIFEST_TMPL.format(pending_id), "version": "1.0.0"}
+                    input_schema = _MOCK_INPUT_SCHEMA
+                    output_schema = _MOCK_OUTPUT_SCHEMA
+
+                logging.info("[%s] Manifest loaded: %s", pending_id, manifest)
+                self._manifest[pending_id] = manifest
+
+                logging.debug("[%s] Input schema loaded: %s", pending_id, input_schema)
+                logging.debug("[%s] Output schema loaded: %s", pending_id, output_schema)
+                self._schema[pending_id] = (input_schema, output_schema)
+
+    # ----------------------------------------------------------------------
+    def _ensure_connected(self, app_id: str) -> Optional[Remote]:
+        """
+        Returns the Remote connection for an app, opening it on first use.
+
+        Args:
+            app_id (str): The application ID to connect to.
+
+        Returns:
+            Optional[Remote]: The connection, or None if the app is unknown or connecting failed.
+        """
+        connection = self._connections.get(app_id)
+        if connection is not None or app_id not in self._app_ids:
+            return connection
+
+        with self._lock:
+            connection = self._connections.get(app_id)
+            if connection is None:
+                connection = self._connect(app_id)
+                if connection is not None:
+                    self._connections[app_id] = connection
+                    logging.info("[%s] Connection established.", app_id)
+        return connection
+
+    # ----------------------------------------------------------------------
+    def _get_output_marshmallow(self, app_id: str) -> Tuple[Any, bool]:
+        """
+        Returns the marshmallow schema built from an app's output schema, building it once.
+
+        Args:
+            app_id (str): The application ID whose output schema is needed.
+
+        Returns:
+            Tuple[Any, bool]: The marshmallow schema instance, and whether it has resource fields.
+        """
+        cached = self._output_marshmallow.get(app_id)
+        if cached is None:
+            marshmallow = json_schema_to_marshmallow(self.schema(app_id, 'output'))()
+            cached = self._output_marshmallow[app_id] = (marshmallow, has_resource_fields(marshmallow))
+        return cached
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _connect(app_id: str) -> Optional[Remote]:
+        """
+        Opens the Remote connection for an app, logging and swallowing failures.
+
+        Args:
+            app_id (str): The application ID to connect to.
+
+        Returns:
+            Optional[Remote]: The connected Remote, or None if connecting failed.
+        """
+        base_url = app_id.strip('/')
+        try:
+            return Remote(f"wss://{base_url}/app", f"{app_id}-proxy").connect()
+        except Exception as e:
+            logging.error("[%s] Initialization failed: %s", app_id, e)
+            return None
+
+    # ----------------------------------------------------------------------
+    def close(self) -> None:
+        """
+        Closes every Remote connection held by this Stub.
+        """
+        for app_id, connection in self._connections.items():
+            try:
+                connection.close()
             except Exception as e:
-                logging.error(f"[{app_id}] Initialization failed: {e}")
+                logging.error("[%s] Closing connection failed: %s", app_id, e)
+        self._connections.clear()
 
     # ----------------------------------------------------------------------
     def call(self, app_id: str, data: Any, uid: str = 'super-user') -> dict:
@@ -95,49 +257,81 @@ class Stub:
         Raises:
             Exception: If no connection is found for the provided app ID, or execution fails.
         """
-        connection = self._connections.get(app_id)
+        if app_id not in self._app_ids:
+            raise Exception(f"Connection not found for app ID: {app_id}")
+
+        # In mock mode no connection is needed
+        if self._mock_mode:
+            return {"result": _MOCK_RESULTS.get(app_id, "Mock response for " + app_id)}
+
+        connection = self._ensure_connected(app_id)
         if not connection:
             raise Exception(f"Connection not found for app ID: {app_id}")
 
         try:
-            # For testing, we'll mock the results
-            if not REQUESTS_AVAILABLE or True:  # Force mock mode for now
-                # Create mock response based on app_id
-                if app_id == "f0997a01-d6d3-a5fe-53d8-561300318557":  # Text-to-Image
-                    # Generate a small 1x1 transparent PNG for testing
-                    mock_image_data = bytes.fromhex('89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c4890000000d4944415478da6364000002000001010901b10000000049454e44ae426082')
-                    return {"result": mock_image_data}
-                elif app_id == "69543f29-4d41-4afc-7f29-3d51591f11eb":  # Image-to-3D
-                    # Generate a small mock GLB file (just a few bytes) for testing
-                    mock_model_data = bytes.fromhex('676c5446020000000c0000004a534f4e7b22617373657473223a5b5d7d00')
-                    return {"result": mock_model_data}
-                else:
-                    # Generic mock response
-                    return {"result": "Mock response for " + app_id}
-            
             # Real execution path
             handler = connection.execute(data, uid)
             result = connection.get_response(handler)
 
-            schema = self.schema(app_id, 'output')
-            marshmallow = json_schema_to_marshmallow(schema)
-            handle_resources = has_resource_fields(marshmallow())
-
+            marshmallow, handle_resources = self._get_output_marshmallow(app_id)
             if handle_resources:
-                result = resolve_resources("https://" + app_id + "/resource?reid={reid}", result, marshmallow())
+                result = resolve_resources("https://" + app_id + "/resource?reid={reid}", result, marshmallow)
 
             return result
         except Exception as e:
-            logging.error(f"[{app_id}] Execution failed: {e}")
+            logging.error("[%s] Execution failed: %s", app_id, e)
             # For testing, return a mock response even on failure
-            if app_id == "f0997a01-d6d3-a5fe-53d8-561300318557":  # Text-to-Image
-                mock_image_data = bytes.fromhex('89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c4890000000d4944415478da6364000002000001010901b10000000049454e44ae426082')
-                return {"result": mock_image_data}
-            elif app_id == "69543f29-4d41-4afc-7f29-3d51591f11eb":  # Image-to-3D
-                mock_model_data = bytes.fromhex('676c5446020000000c0000004a534f4e7b22617373657473223a5b5d7d00')
-                return {"result": mock_model_data}
+            mock_data = _MOCK_RESULTS.get(app_id)
+            if mock_data is not None:
+                return {"result": mock_data}
             return {"result": "Error mock response for " + app_id}
 
+    # ----------------------------------------------------------------------
+    async def acall(self, app_id: str, data: Any, uid: str = 'super-user',
+                    retries: int = 0, backoff: float = 0.5) -> dict:
+        """
+        Asynchronous variant of call() that runs the blocking request in a worker
+        thread, so it never stalls the event loop.
+
+        Args:
+            app_id (str): The application ID to route the request to.
+            data (Any): The input data to send to the app.
+            uid (str): The unique user/session identifier for tracking (default: 'super-user').
+            retries (int): How many times to retry a call that raises (default: 0).
+            backoff (float): Seconds to wait before the first retry, doubled after each one.
+
+        Returns:
+            dict: The output data returned by the app.
+
+        Raises:
+            Exception: If the call still fails after all retries.
+        """
+        loop = asyncio.get_running_loop()
+        delay = backoff
+        for attempt in range(retries + 1):
+            try:
+                return await loop.run_in_executor(None, functools.partial(self.call, app_id, data, uid))
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                logging.warning("[%s] Call failed (%s), retrying in %.1fs", app_id, e, delay)
+                # Wait without blocking the event loop
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    # ----------------------------------------------------------------------
+    async def batch_call(self, calls: List[Tuple[str, Any, str]]) -> List[dict]:
+        """
+        Runs several independent app calls concurrently.
+
+        Args:
+            calls (List[Tuple[str, Any, str]]): (app_id, data, uid) for each call.
+
+        Returns:
+            List[dict]: The output of each call, in the same order as the input.
+        """
+        return await asyncio.gather(*(self.acall(app_id, data, uid) for app_id, data, uid in calls))
+
     # ----------------------------------------------------------------------
     def manifest(self, app_id: str) -> dict:
         """
@@ -149,6 +343,7 @@ class Stub:
         Returns:
             dict: The manifest data for the app, or an empty dictionary if not found.
         """
+        self._ensure_loaded(app_id)
         return self._manifest.get(app_id, {})
 
     # ----------------------------------------------------------------------
@@ -166,6 +361,7 @@ class Stub:
         Raises:
             ValueError: If the schema type is invalid or the schema is not found.
         """
+        self._ensure_loaded(app_id)
         _input, _output = self._schema.get(app_id, (None, None))
 
         if type == 'input':
@@ -1,9 +1,19 @@
+import atexit
 import logging
 import base64
 import json
 import os
 import re
-from typing import Dict, List, Optional, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Import orjson conditionally; stdlib json is the fallback serializer
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from ontology_dc8f06af066e4a7880a5938933236037.config import ConfigClass
 from ontology_dc8f06af066e4a7880a5938933236037.input import InputClass
@@ -25,6 +35,52 @@ IMAGE_TO_3D_APP_ID = "69543f29-4d41-4afc-7f29-3d51591f11eb"
 # Configurations for the app
 configurations: Dict[str, ConfigClass] = dict()
 
+def _dumps(obj: Any) -> str:
+    """Serialize a response payload to a JSON string."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+# Word tokenizer and ignored words for automatic tag extraction
+_WORD_RE = re.compile(r'\b\w+\b')
+_TAG_STOPWORDS = frozenset({'with', 'and', 'the', 'this', 'that', 'make', 'create', 'generate'})
+MAX_AUTO_TAGS = 5
+
+# Background threads for disk writes that overlap with remote app calls
+_IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="io")
+
+# Most model passes execute_batch runs at the same time
+MAX_BATCH_WORKERS = 8
+
+# Stubs reused across requests, keyed by their sorted app IDs
+_STUB_CACHE: Dict[Tuple[str, ...], Stub] = {}
+_STUB_CACHE_LOCK = threading.Lock()
+
+def _get_stub(app_ids: List[str]) -> Stub:
+    """
+    Return a Stub for the given app IDs, creating and caching it on first use.
+
+    Args:
+        app_ids (List[str]): The application IDs the Stub connects to.
+
+    Returns:
+        Stub: The shared Stub; its manifests, schemas and connections load lazily on first use and stay cached.
+    """
+    key = tuple(sorted(app_ids))
+    with _STUB_CACHE_LOCK:
+        stub = _STUB_CACHE.get(key)
+        if stub is None:
+            stub = _STUB_CACHE[key] = Stub(app_ids)
+        return stub
+
+@atexit.register
+def _close_stubs() -> None:
+    """Close the connections of every cached Stub at interpreter exit."""
+    with _STUB_CACHE_LOCK:
+        for stub in _STUB_CACHE.values():
+            stub.close()
+        _STUB_CACHE.clear()
+
 ############################################################
 # Config callback function
 ############################################################
@@ -37,11 +93,11 @@ def config(configuration: Dict[str, ConfigClass], state: State) -> None:
         state (State): The current state of the application.
     """
     for uid, conf in configuration.items():
-        logging.info(f"Saving new config for user with id:'{uid}'")
+        logging.info("Saving new config for user with id:'%s'", uid)
         # If app_ids is not set, set default app IDs
         if not conf.app_ids:
             conf.app_ids = [TEXT_TO_IMAGE_APP_ID, IMAGE_TO_3D_APP_ID]
-            logging.info(f"Setting default app IDs for user '{uid}'")
+            logging.info("Setting default app IDs for user '%s'", uid)
         configurations[uid] = conf
 
 
@@ -55,6 +111,87 @@ def execute(model: AppModel) -> None:
     Args:
         model (AppModel): The model object containing request and response structures.
     """
+    _execute(model)
+
+
+def execute_batch(models: List[AppModel]) -> None:
+    """
+    Batch execution entry point for handling several model passes.
+
+    Memory queries are answered together with a single memory search pass and
+    the prompts of all creation requests are enhanced with a single LLM call;
+    the creation passes then run concurrently, so their remote app calls overlap.
+
+    Args:
+        models (List[AppModel]): The model objects containing request and response structures.
+    """
+    if not models:
+        return
+
+    llm_enhancer = get_llm_enhancer()
+    prompts = [model.request.prompt.strip() if model.request.prompt else "" for model in models]
+    enhanced_prompts: List[Optional[str]] = [None] * len(models)
+
+    query_indices = []
+    creation_indices = []
+    for i, prompt in enumerate(prompts):
+        if prompt:
+            (query_indices if llm_enhancer.is_memory_query(prompt) else creation_indices).append(i)
+
+    # Answer all memory queries at once
+    if query_indices:
+        logging.info("Processing %s memory queries", len(query_indices))
+        results = get_memory_query_handler().process_queries([prompts[i] for i in query_indices])
+        for i, (memory_entries, summary) in zip(query_indices, results):
+            _respond_memory_query(models[i], memory_entries, summary)
+
+    # Enhance creation prompts in one call; on failure each pass enhances its own
+    if creation_indices:
+        try:
+            enhanced = llm_enhancer.enhance_prompts([prompts[i] for i in creation_indices])
+            for i, enhanced_prompt in zip(creation_indices, enhanced):
+                enhanced_prompts[i] = enhanced_prompt
+        except Exception as e:
+            logging.error("Error enhancing prompts in batch: %s", e)
+
+    # Run the remaining passes (creations and empty prompts)
+    answered = set(query_indices)
+    remaining = [i for i in range(len(models)) if i not in answered]
+    if not remaining:
+        return
+    with ThreadPoolExecutor(max_workers=min(len(remaining), MAX_BATCH_WORKERS)) as executor:
+        list(executor.map(_execute, [models[i] for i in remaining], [enhanced_prompts[i] for i in remaining]))
+
+
+def _respond_memory_query(model: AppModel, memory_entries: List[Dict], summary: str) -> None:
+    """
+    Write the results of a memory query to the model's response.
+
+    Args:
+        model (AppModel): The model object whose response is filled in.
+        memory_entries (List[Dict]): The matching memory entries.
+        summary (str): A summary message for the results.
+    """
+    # Format the response
+    response_data = {
+        "type": "memory_query",
+        "summary": summary,
+        "results": memory_entries
+    }
+    
+    # Prepare response
+    response: OutputClass = model.response
+    response.message = _dumps(response_data)
+
+
+def _execute(model: AppModel, enhanced_prompt: Optional[str] = None) -> None:
+    """
+    Handle a single model pass.
+
+    Args:
+        model (AppModel): The model object containing request and response structures.
+        enhanced_prompt (Optional[str]): The already enhanced prompt, if the caller enhanced it.
+    """
     # Initialize services
     llm_enhancer = get_llm_enhancer()
     memory_manager = get_memory_manager()
@@ -71,46 +208,41 @@ def execute(model: AppModel) -> None:
 
     # Retrieve user config
     user_config: ConfigClass = configurations.get('super-user', None)
-    logging.info(f"Using configuration: {configurations}")
+    # Only repr the whole configuration dict when debugging
+    logging.debug("Using configuration: %s", configurations)
 
-    # Initialize the Stub with app IDs
+    # Get the (cached) Stub for the app IDs
     app_ids = user_config.app_ids if user_config else [TEXT_TO_IMAGE_APP_ID, IMAGE_TO_3D_APP_ID]
-    stub = Stub(app_ids)
+    stub = _get_stub(app_ids)
 
     # Check if this is a memory-related query
     if llm_enhancer.is_memory_query(prompt):
-        logging.info(f"Processing memory query: {prompt}")
+        logging.info("Processing memory query: %s", prompt)
         # Process memory query
         memory_entries, summary = memory_query_handler.process_query(prompt)
-        
-        # Format the response
-        response_data = {
-            "type": "memory_query",
-            "summary": summary,
-            "results": memory_entries
-        }
-        
-        # Prepare response
-        response: OutputClass = model.response
-        response.message = json.dumps(response_data)
+        _respond_memory_query(model, memory_entries, summary)
         return
 
     # Create a new memory entry
     memory_entry = MemoryEntry(original_prompt=prompt)
     
-    # Enhance prompt with LLM
-    try:
-        enhanced_prompt = llm_enhancer.enhance_prompt(prompt)
+    # Enhance prompt with LLM, unless the batch entry point already did
+    if enhanced_prompt is not None:
         memory_entry.enhanced_prompt = enhanced_prompt
-        logging.info(f"Enhanced prompt: {enhanced_prompt}")
-    except Exception as e:
-        logging.error(f"Error enhancing prompt: {e}")
-        enhanced_prompt = prompt
-        memory_entry.enhanced_prompt = prompt
+        logging.info("Enhanced prompt: %s", enhanced_prompt)
+    else:
+        try:
+            enhanced_prompt = llm_enhancer.enhance_prompt(prompt)
+            memory_entry.enhanced_prompt = enhanced_prompt
+            logging.info("Enhanced prompt: %s", enhanced_prompt)
+        except Exception as e:
+            logging.error("Error enhancing prompt: %s", e)
+            enhanced_prompt = prompt
+            memory_entry.enhanced_prompt = prompt
     
     # Call the Text to Image app
     try:
-        logging.info(f"Calling Text to Image app with prompt: {enhanced_prompt}")
+        logging.info("Calling Text to Image app with prompt: %s", enhanced_prompt)
         image_result = stub.call(TEXT_TO_IMAGE_APP_ID, {'prompt': enhanced_prompt}, 'super-user')
         
         # Extract the image data
@@ -118,17 +250,17 @@ def execute(model: AppModel) -> None:
         if not image_data:
             raise Exception("No image data returned from Text to Image app")
         
-        # Save the image to disk
-        image_path = file_manager.save_image(image_data, memory_entry.id)
-        memory_entry.image_path = image_path
-        logging.info(f"Image saved to: {image_path}")
+        # Save the image and its thumbnail in the background while the 3D model is generated
+        image_save = _IO_POOL.submit(file_manager.save_image_with_thumbnail, image_data, memory_entry.id)
         
     except Exception as e:
-        logging.error(f"Error calling Text to Image app: {e}")
+        logging.error("Error calling Text to Image app: %s", e)
         model.response.message = f"Error generating image: {str(e)}"
         return
     
-    # Call the Image to 3D app
+    # Call the Image to 3D app while the image is still being written
+    model_data = None
+    model_error = None
     try:
         logging.info("Calling Image to 3D app")
         model_result = stub.call(IMAGE_TO_3D_APP_ID, {'image': image_data}, 'super-user')
@@ -138,35 +270,60 @@ def execute(model: AppModel) -> None:
         if not model_data:
             raise Exception("No model data returned from Image to 3D app")
         
-        # Save the 3D model to disk
-        model_path = file_manager.save_model(model_data, memory_entry.id)
-        memory_entry.model_path = model_path
-        logging.info(f"3D model saved to: {model_path}")
-        
     except Exception as e:
-        logging.error(f"Error calling Image to 3D app: {e}")
+        logging.error("Error calling Image to 3D app: %s", e)
+        model_error = e
+    
+    # Wait for the image to be written before recording its path, and before
+    # writing the model, so a failed image save leaves no orphaned model file
+    try:
+        image_path, thumb_path = image_save.result()
+        memory_entry.image_path = image_path
+        if thumb_path:
+            memory_entry.metadata['thumb_path'] = thumb_path
+        logging.info("Image saved to: %s", image_path)
+    except Exception as e:
+        logging.error("Error saving image: %s", e)
+        model.response.message = f"Error generating image: {str(e)}"
+        return
+    
+    # Save the 3D model to disk
+    if model_error is None:
+        try:
+            model_path = file_manager.save_model(model_data, memory_entry.id)
+            memory_entry.model_path = model_path
+            logging.info("3D model saved to: %s", model_path)
+        except Exception as e:
+            logging.error("Error saving 3D model: %s", e)
+            model_error = e
+    
+    if model_error is not None:
         # Still save the memory entry with just the image
         memory_manager.store(memory_entry)
-        model.response.message = f"Image generated successfully, but error creating 3D model: {str(e)}"
+        model.response.message = f"Image generated successfully, but error creating 3D model: {str(model_error)}"
         return
     
-    # Save the complete memory entry
-    memory_id = memory_manager.store(memory_entry)
-    logging.info(f"Memory entry saved with ID: {memory_id}")
+    # Save the complete memory entry and its tags with a single persistent write
+    with memory_manager.batch():
+        memory_id = memory_manager.store(memory_entry)
+        logging.info("Memory entry saved with ID: %s", memory_id)
     
-    # Add automatic tags based on the prompt
-    try:
-        # Simple keyword extraction for tags
-        words = re.findall(r'\b\w+\b', prompt.lower())
-        important_words = [word for word in words if len(word) > 3 and word not in 
-                          ['with', 'and', 'the', 'this', 'that', 'make', 'create', 'generate']]
-        if important_words:
-            tags = important_words[:5]  # Limit to 5 tags
-            memory_entry.metadata['tags'] = tags
-            memory_manager.update(memory_id, {'metadata': memory_entry.metadata})
-            logging.info(f"Added tags: {tags}")
-    except Exception as e:
-        logging.error(f"Error adding tags: {e}")
+        # Add automatic tags based on the prompt
+        try:
+            # Simple keyword extraction for tags, stopping at the tag limit
+            tags = []
+            for match in _WORD_RE.finditer(prompt.lower()):
+                word = match.group()
+                if len(word) > 3 and word not in _TAG_STOPWORDS:
+                    tags.append(word)
+                    if len(tags) == MAX_AUTO_TAGS:
+                        break
+            if tags:
+                memory_entry.metadata['tags'] = tags
+                memory_manager.update(memory_id, {'metadata': memory_entry.metadata})
+                logging.info("Added tags: %s", tags)
+        except Exception as e:
+            logging.error("Error adding tags: %s", e)
     
     # Prepare the response data
     response_data = {
@@ -181,4 +338,4 @@ def execute(model: AppModel) -> None:
     
     # Prepare response
     response: OutputClass = model.response
-    response.message = json.dumps(response_data)
\ No newline at end of file
+    response.message = _dumps(response_data)
\ No newline at end of file
@@ -12,9 +12,14 @@ def has_resource_fields(schema):
     return False
 
 
+def _empty_schema():
+    """Mock marshmallow schema factory shared by every converted schema."""
+    return None
+
+
 def json_schema_to_marshmallow(schema):
     """Mock json_schema_to_marshmallow method."""
-    return lambda: None
+    return _empty_schema
 
 
 def resolve_resources(url_template, result, schema):
@@ -5,6 +5,8 @@ Mock Proxy implementation for testing.
 class Proxy:
     """Mock Proxy class for communication."""
     
+    __slots__ = ('url', 'tag', 'ssl_verify')
+    
     def __init__(self, url, tag, ssl_verify=True):
         self.url = url
         self.tag = tag
@@ -22,6 +24,9 @@ class Proxy:
 class ExecutionResult:
     """Mock execution result."""
     
+    # One is created per request, so keep instances small and cheap to build
+    __slots__ = ('_data', '_status')
+    
     def __init__(self, data=None):
         self._data = data
         self._status = "completed"  # Always completed in mock
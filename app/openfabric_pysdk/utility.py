@@ -8,7 +8,14 @@ class SchemaUtil:
     @staticmethod
     def create(instance, data):
         """Create an instance from data."""
+        attrs = getattr(instance, '__dict__', None)
+        if attrs is None:
+            # Slotted instances have no __dict__ to update in bulk
+            attrs = {}
+        else:
+            # Plain instance attributes (e.g. dataclass fields) are assigned in one update
+            attrs.update((key, value) for key, value in data.items() if key in attrs)
         for key, value in data.items():
-            if hasattr(instance, key):
+            if key not in attrs and hasattr(instance, key):
                 setattr(instance, key, value)
         return instance
\ No newline at end of file
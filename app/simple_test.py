@@ -94,16 +94,15 @@ def test_memory_system():
         )
     ]
     
-    # Store entries
+    # Add some tags
     for entry in entries:
-        entry_id = memory_manager.store(entry)
-        print(f"Stored entry with ID: {entry_id}")
-        
-        # Add some tags
         keywords = entry.original_prompt.lower().split()
         tags = [word for word in keywords if len(word) > 3]
         entry.metadata["tags"] = tags
-        memory_manager.update(entry_id, {"metadata": entry.metadata})
+    
+    # Store entries in one batch
+    for entry_id in memory_manager.store_batch(entries):
+        print(f"Stored entry with ID: {entry_id}")
     
     # Test retrieval
     print("\n=== Testing Memory Retrieval ===")
@@ -3,11 +3,14 @@ import json
 import os
 import shutil
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 
-from core.memory_manager import MemoryEntry, get_memory_manager
+from core.memory_manager import MemoryEntry, MemoryManager, get_memory_manager
 from core.file_manager import get_file_manager
 from core.llm_enhancer import get_llm_enhancer
+from core.memory_query import MemoryQueryHandler
+from core.real_llm_enhancer import BatchingEnhancer
 
 class TestMemorySystem(unittest.TestCase):
     """Test the memory system functionality"""
@@ -18,15 +21,8 @@ class TestMemorySystem(unittest.TestCase):
         self.test_dir = os.path.join('datastore', 'test_' + str(uuid.uuid4()))
         os.makedirs(self.test_dir, exist_ok=True)
         
-        # Create test instance with the test directory
-        self.memory_manager = get_memory_manager()
-        # Override the storage path for testing
-        self.memory_manager._storage_path = self.test_dir
-        self.memory_manager._memory_file = os.path.join(self.test_dir, 'memory.json')
-        
-        # Create empty memory file
-        with open(self.memory_manager._memory_file, 'w') as f:
-            json.dump({}, f)
+        # Create a test instance backed by the test directory
+        self.memory_manager = MemoryManager(storage_path=self.test_dir)
         
         # Get other components
         self.file_manager = get_file_manager()
@@ -34,6 +30,8 @@ class TestMemorySystem(unittest.TestCase):
     
     def tearDown(self):
         """Clean up after tests"""
+        self.memory_manager.close()
+        
         # Remove test directory and all its contents
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
@@ -55,6 +53,15 @@ class TestMemorySystem(unittest.TestCase):
         self.assertEqual(entry.model_path, "/path/to/model.glb")
         self.assertIsInstance(entry.id, str)
         
+    def test_memory_entry_timestamps(self):
+        """Test that entries get increasing timestamps unless one is given"""
+        entries = [MemoryEntry(original_prompt=f"Entry {i}") for i in range(100)]
+        timestamps = [entry.timestamp for entry in entries]
+        self.assertEqual(len(set(timestamps)), len(timestamps))
+        self.assertEqual(timestamps, sorted(timestamps))
+
+        self.assertEqual(MemoryEntry(original_prompt="Dated", timestamp=1234.5).timestamp, 1234.5)
+
     def test_memory_storage_and_retrieval(self):
         """Test storing and retrieving memory entries"""
         # Create and store an entry
@@ -73,6 +80,78 @@ class TestMemorySystem(unittest.TestCase):
         self.assertEqual(retrieved_entry.enhanced_prompt, "Enhanced test storage prompt")
         self.assertEqual(retrieved_entry.id, memory_id)
     
+    def test_memory_persists_across_instances(self):
+        """Test that stored entries are reloaded from the log by a new instance"""
+        entry = MemoryEntry(original_prompt="Persistent castle")
+        memory_id = self.memory_manager.store(entry)
+        self.memory_manager.close()
+        
+        reloaded = MemoryManager(storage_path=self.test_dir)
+        try:
+            retrieved_entry = reloaded.retrieve(memory_id)
+            self.assertIsNotNone(retrieved_entry)
+            self.assertEqual(retrieved_entry.original_prompt, "Persistent castle")
+        finally:
+            reloaded.close()
+    
+    def test_memory_store_batch(self):
+        """Test that a batch of entries is persisted and reloadable"""
+        entries = [MemoryEntry(original_prompt=f"Batch entry {i}") for i in range(3)]
+        memory_ids = self.memory_manager.store_batch(entries)
+        self.assertEqual(memory_ids, [entry.id for entry in entries])
+        self.memory_manager.close()
+        
+        reloaded = MemoryManager(storage_path=self.test_dir)
+        try:
+            self.assertEqual(len(reloaded.search("batch")), 3)
+        finally:
+            reloaded.close()
+    
+    def test_memory_batches_from_threads(self):
+        """Test that batches stored from several threads are all persisted"""
+        def store_pair(i):
+            with self.memory_manager.batch():
+                self.memory_manager.store(MemoryEntry(original_prompt=f"Threaded comet {i}"))
+                self.memory_manager.store(MemoryEntry(original_prompt=f"Threaded nebula {i}"))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(store_pair, range(8)))
+        self.memory_manager.close()
+
+        reloaded = MemoryManager(storage_path=self.test_dir)
+        try:
+            self.assertEqual(len(reloaded.search("threaded", limit=100)), 16)
+        finally:
+            reloaded.close()
+
+    def test_memory_compaction(self):
+        """Test that compaction folds the log into the snapshot file"""
+        entry = MemoryEntry(original_prompt="Compacted robot")
+        memory_id = self.memory_manager.store(entry)
+        self.memory_manager.compact()
+        
+        with open(os.path.join(self.test_dir, 'memory.json'), 'r') as f:
+            self.assertIn(memory_id, json.load(f))
+        self.assertEqual(os.path.getsize(os.path.join(self.test_dir, 'memory.json.log')), 0)
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, 'memory.json.tmp')))
+        self.assertEqual(len(self.memory_manager.search("robot")), 1)
+    
+    def test_memory_compaction_keeps_other_writers(self):
+        """Test that compaction keeps entries logged by another manager on the same store"""
+        other = MemoryManager(storage_path=self.test_dir)
+        try:
+            other_id = other.store(MemoryEntry(original_prompt="Floating island"))
+            own_id = self.memory_manager.store(MemoryEntry(original_prompt="Sunken ship"))
+            self.memory_manager.compact()
+        finally:
+            other.close()
+        
+        with open(os.path.join(self.test_dir, 'memory.json'), 'r') as f:
+            snapshot = json.load(f)
+        self.assertIn(other_id, snapshot)
+        self.assertIn(own_id, snapshot)
+        self.assertEqual(len(self.memory_manager.search("island")), 1)
+    
     def test_llm_enhancement(self):
         """Test LLM prompt enhancement"""
         # Test various prompt types
@@ -91,6 +170,24 @@ class TestMemorySystem(unittest.TestCase):
             # Check that original prompt is preserved
             self.assertTrue(prompt in enhanced)
     
+    def test_batching_enhancer(self):
+        """Test that concurrently submitted prompts are enhanced in shared batches"""
+        batcher = BatchingEnhancer(self.llm_enhancer, max_wait=0.05)
+        try:
+            prompts = [f"Create a dragon number {i}" for i in range(6)]
+            with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+                enhanced = list(executor.map(batcher.enhance_prompt, prompts))
+        finally:
+            batcher.close()
+        
+        for prompt, enhanced_prompt in zip(prompts, enhanced):
+            self.assertTrue(enhanced_prompt.startswith(prompt))
+
+        # Prompts submitted after close fail instead of waiting forever
+        with self.assertRaises(RuntimeError):
+            batcher.submit("Create a dragon").result(timeout=1)
+        batcher.close()
+
     def test_memory_search(self):
         """Test searching memory entries"""
         # Create and store multiple entries
@@ -115,7 +212,104 @@ class TestMemorySystem(unittest.TestCase):
         # Get recent entries
         recent_results = self.memory_manager.list_recent(limit=3)
         self.assertEqual(len(recent_results), 3)
+        
+        # Count all entries
+        self.assertEqual(self.memory_manager.count(), 4)
+    
+    def test_memory_search_after_update(self):
+        """Test that updated prompts and tags are reflected in search results"""
+        entry = MemoryEntry(original_prompt="Golden castle on a hill")
+        memory_id = self.memory_manager.store(entry)
+        
+        self.memory_manager.update(memory_id, {
+            "original_prompt": "Silver tower by the sea",
+            "metadata": {"tags": ["lighthouse"]}
+        })
+        
+        self.assertEqual(len(self.memory_manager.search("castle")), 0)
+        self.assertEqual(len(self.memory_manager.search("tower")), 1)
+        self.assertEqual(len(self.memory_manager.search("lighthouse")), 1)
+    
+    def test_memory_search_substring(self):
+        """Test that search terms also match inside longer indexed words"""
+        self.memory_manager.store(MemoryEntry(original_prompt="Two dragons over a lighthouse"))
+        self.memory_manager.store(MemoryEntry(original_prompt="A quiet harbor"))
+
+        self.assertEqual(len(self.memory_manager.search("dragon")), 1)
+        self.assertEqual(len(self.memory_manager.search("house")), 1)
+        self.assertEqual(len(self.memory_manager.search("ar")), 1)
+        self.assertEqual(len(self.memory_manager.search("dragonfly")), 0)
+
+    def test_memory_search_punctuated_terms(self):
+        """Test that terms with punctuation match as whole substrings, not word fragments"""
+        for prompt in ["A sci-fi city", "Dragon breathing fire", "A rabbit in a field"]:
+            self.memory_manager.store(MemoryEntry(original_prompt=prompt))
+
+        sci_fi_results = self.memory_manager.search("sci-fi")
+        self.assertEqual([entry.original_prompt for entry in sci_fi_results], ["A sci-fi city"])
+        self.assertEqual(len(self.memory_manager.search("o'clock")), 0)
+
+    def test_memory_search_unsorted_limit(self):
+        """Test that an unsorted limited search keeps storage order"""
+        for prompt in ["Red dragon", "Blue dragon", "Green dragon", "Gold dragon"]:
+            self.memory_manager.store(MemoryEntry(original_prompt=prompt))
+
+        results = self.memory_manager.search("dragon", limit=2, sort_by="original_prompt")
+        self.assertEqual([entry.original_prompt for entry in results], ["Red dragon", "Blue dragon"])
+
+    def test_memory_multi_query(self):
+        """Test that multi_query returns the same results as separate searches"""
+        for prompt in ["Red dragon breathing fire", "Blue robot", "Purple dragon in the sky"]:
+            self.memory_manager.store(MemoryEntry(original_prompt=prompt))
+
+        queries = ["dragon", "robot", "dragon sky", ""]
+        results = self.memory_manager.multi_query(queries, limit=5)
+        self.assertEqual(
+            [[entry.id for entry in entries] for entries in results],
+            [[entry.id for entry in self.memory_manager.search(query, limit=5)] for query in queries]
+        )
+        self.assertEqual([len(entries) for entries in results], [2, 1, 2, 3])
+
+    def test_process_queries(self):
+        """Test that batched memory queries match one-by-one processing"""
+        handler = MemoryQueryHandler()
+        handler.memory_manager = self.memory_manager
+        for prompt in ["Red dragon breathing fire", "Blue robot", "Purple dragon in the sky"]:
+            self.memory_manager.store(MemoryEntry(original_prompt=prompt))
+
+        queries = ["Find dragons", "Find robots", "Find dragons"]
+        batched = handler.process_queries(queries)
+        self.assertEqual([len(results) for results, _ in batched], [2, 1, 2])
+
+        single = MemoryQueryHandler()
+        single.memory_manager = self.memory_manager
+        self.assertEqual(batched, [single.process_query(query) for query in queries])
+
+    def test_add_tags(self):
+        """Test that add_tags skips duplicates and keeps other metadata"""
+        entry = MemoryEntry(original_prompt="Red dragon", metadata={"tags": ["dragon"], "style": "ink"})
+        memory_id = self.memory_manager.store(entry)
+        
+        handler = MemoryQueryHandler()
+        handler.memory_manager = self.memory_manager
+        result = handler.add_tags(memory_id, ["red", "dragon", "red"])
+        
+        self.assertEqual(result["metadata"]["tags"], ["dragon", "red"])
+        self.assertEqual(result["metadata"]["style"], "ink")
     
+    def test_process_query_cache_invalidated_by_store(self):
+        """Test that cached query results are refreshed after a new entry is stored"""
+        handler = MemoryQueryHandler()
+        handler.memory_manager = self.memory_manager
+        self.memory_manager.store(MemoryEntry(original_prompt="Red dragon breathing fire"))
+
+        results, _ = handler.process_query("Show me my dragons")
+        self.assertEqual(len(results), 1)
+
+        self.memory_manager.store(MemoryEntry(original_prompt="Purple dragon in the sky"))
+        results, _ = handler.process_query("Show me my dragons")
+        self.assertEqual(len(results), 2)
+
     def test_memory_query_detection(self):
         """Test detecting memory-related queries"""
         # Memory queries
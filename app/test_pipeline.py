@@ -1,9 +1,18 @@
 import argparse
+import functools
 import json
 import logging
 import os
+import queue
 import sys
-import time
+from typing import Any, List, Optional
+
+# Import orjson conditionally; stdlib json is the fallback codec
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from ontology_dc8f06af066e4a7880a5938933236037.input import InputClass
 from ontology_dc8f06af066e4a7880a5938933236037.output import OutputClass
@@ -19,9 +28,39 @@ import main
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+log = logging.getLogger(__name__)
+
+# Managers bound once; creating them here also keeps the concurrent tests
+# from racing on their lazy initialization
+FILE_MANAGER = get_file_manager()
+MEMORY_MANAGER = get_memory_manager()
+
+def _loads(data: str) -> Any:
+    """Parse a JSON response (raises ValueError on bad input)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Most memory query results pretty-printed per response
+LOG_PREVIEW_RESULTS = 5
 
+def _log_response(response_data: Any) -> None:
+    """Pretty-print a parsed response at INFO, serializing it only if INFO is enabled"""
+    if not log.isEnabledFor(logging.INFO):
+        return
+    # Only print the first few results, so large queries keep the log short
+    results = response_data.get("results")
+    if isinstance(results, list) and len(results) > LOG_PREVIEW_RESULTS:
+        log.info("%d total results (showing %d)", len(results), LOG_PREVIEW_RESULTS)
+        response_data = {**response_data, "results": results[:LOG_PREVIEW_RESULTS]}
+    if ORJSON_AVAILABLE:
+        log.info("%s", orjson.dumps(response_data, option=orjson.OPT_INDENT_2).decode('utf-8'))
+    else:
+        log.info("%s", json.dumps(response_data, indent=2))
+
+@functools.lru_cache(maxsize=1)
 def create_test_config():
-    """Create a test configuration with app IDs"""
+    """Create a test configuration with app IDs (only registered once)"""
     # Create a config class instance
     config_class = ConfigClass()
     config_class.app_ids = [main.TEXT_TO_IMAGE_APP_ID, main.IMAGE_TO_3D_APP_ID]
@@ -29,35 +68,61 @@ def create_test_config():
     # Call the config function to register it
     conf_dict = {'super-user': config_class}
     main.config(conf_dict, None)
-    logging.info("Test configuration created")
+    log.info("Test configuration created")
+
+def _create_model():
+    """Create an app model with an empty request and response"""
+    model = AppModel()
+    model.request = InputClass()
+    model.response = OutputClass()
+    return model
+
+# App models reused across test runs, one per concurrent caller
+_MODEL_POOL: "queue.LifoQueue[AppModel]" = queue.LifoQueue()
+for _ in range(os.cpu_count() or 1):
+    _MODEL_POOL.put(_create_model())
+
+def _execute(prompt: str) -> Optional[str]:
+    """Run a prompt through main.execute on a pooled model and return the response message"""
+    model = _MODEL_POOL.get()
+    try:
+        model.request.prompt = prompt
+        model.response.message = None
+        main.execute(model)
+        return model.response.message
+    finally:
+        _MODEL_POOL.put(model)
+
+def _execute_batch(prompts: List[str]) -> List[Optional[str]]:
+    """Run several prompts through one main.execute_batch call and return the response messages"""
+    models = [_create_model() for _ in prompts]
+    for model, prompt in zip(models, prompts):
+        model.request.prompt = prompt
+    main.execute_batch(models)
+    return [model.response.message for model in models]
 
 def test_prompt(prompt):
     """Test the pipeline with a specific prompt"""
-    logging.info(f"Testing prompt: {prompt}")
-    
-    # Create a request
-    input_class = InputClass()
-    input_class.prompt = prompt
-    
-    # Create a response
-    output_class = OutputClass()
-    
-    # Create a model
-    model = AppModel()
-    model.request = input_class
-    model.response = output_class
+    log.info("Testing prompt: %s", prompt)
     
-    # Call the execute function
-    main.execute(model)
+    # Call the execute function and check the response
+    return check_prompt_response(_execute(prompt))
+
+def test_prompts(prompts):
+    """Test the pipeline with several prompts executed as one batch"""
+    for prompt in prompts:
+        log.info("Testing prompt: %s", prompt)
     
-    # Get the response
-    response = model.response.message
-    logging.info(f"Response received")
+    return [check_prompt_response(response) for response in _execute_batch(prompts)]
+
+def check_prompt_response(response):
+    """Log and check the response to a prompt, returning the memory ID of a creation"""
+    log.info("Response received")
     
     try:
         # Parse JSON response
-        response_data = json.loads(response)
-        logging.info(json.dumps(response_data, indent=2))
+        response_data = _loads(response)
+        _log_response(response_data)
         
         # Check if it's a creation
         if response_data.get("type") == "creation":
@@ -65,76 +130,71 @@ def test_prompt(prompt):
             image_path = response_data.get("image_path")
             model_path = response_data.get("model_path")
             
-            logging.info(f"Memory ID: {memory_id}")
-            logging.info(f"Image Path: {image_path}")
-            logging.info(f"Model Path: {model_path}")
+            log.info("Memory ID: %s", memory_id)
+            log.info("Image Path: %s", image_path)
+            log.info("Model Path: %s", model_path)
             
-            # Check if files exist
-            file_manager = get_file_manager()
-            if image_path and os.path.exists(image_path):
-                image_size = os.path.getsize(image_path)
-                logging.info(f"Image file exists ({image_size} bytes)")
+            # Check if files exist, with a single stat per file
+            file_info = FILE_MANAGER.get_files_info(path for path in (image_path, model_path) if path)
+            image_exists, image_size, _ = file_info.get(image_path, (False, 0, ""))
+            if image_exists:
+                log.info("Image file exists (%s bytes)", image_size)
             else:
-                logging.warning("Image file does not exist")
+                log.warning("Image file does not exist")
                 
-            if model_path and os.path.exists(model_path):
-                model_size = os.path.getsize(model_path)
-                logging.info(f"Model file exists ({model_size} bytes)")
+            model_exists, model_size, _ = file_info.get(model_path, (False, 0, ""))
+            if model_exists:
+                log.info("Model file exists (%s bytes)", model_size)
             else:
-                logging.warning("Model file does not exist")
+                log.warning("Model file does not exist")
                 
             return memory_id
                 
         # Check if it's a memory query
         elif response_data.get("type") == "memory_query":
             results = response_data.get("results", [])
-            logging.info(f"Returned {len(results)} memory entries")
+            log.info("Returned %s memory entries", len(results))
             
             return None
             
-    except json.JSONDecodeError:
-        logging.error("Failed to parse response as JSON")
-        logging.info(f"Raw response: {response}")
+    except ValueError:
+        log.error("Failed to parse response as JSON")
+        log.info("Raw response: %s", response)
     
     return None
 
 def test_memory_query(query):
     """Test a memory query"""
-    logging.info(f"Testing memory query: {query}")
-    
-    # Create a request
-    input_class = InputClass()
-    input_class.prompt = query
-    
-    # Create a response
-    output_class = OutputClass()
+    log.info("Testing memory query: %s", query)
     
-    # Create a model
-    model = AppModel()
-    model.request = input_class
-    model.response = output_class
-    
-    # Call the execute function
-    main.execute(model)
+    # Call the execute function and check the response
+    return check_memory_query_response(_execute(query))
+
+def test_memory_queries(queries):
+    """Test several memory queries answered as one batch"""
+    for query in queries:
+        log.info("Testing memory query: %s", query)
     
-    # Get the response
-    response = model.response.message
-    logging.info(f"Response received")
+    return [check_memory_query_response(response) for response in _execute_batch(queries)]
+
+def check_memory_query_response(response):
+    """Log and check the response to a memory query, returning its results"""
+    log.info("Response received")
     
     try:
         # Parse JSON response
-        response_data = json.loads(response)
-        logging.info(json.dumps(response_data, indent=2))
+        response_data = _loads(response)
+        _log_response(response_data)
         
         # Check the type
         if response_data.get("type") == "memory_query":
             results = response_data.get("results", [])
-            logging.info(f"Returned {len(results)} memory entries")
+            log.info("Returned %s memory entries", len(results))
             return results
             
-    except json.JSONDecodeError:
-        logging.error("Failed to parse response as JSON")
-        logging.info(f"Raw response: {response}")
+    except ValueError:
+        log.error("Failed to parse response as JSON")
+        log.info("Raw response: %s", response)
     
     return []
 
@@ -144,42 +204,31 @@ def run_tests():
     create_test_config()
     
     # Clear any existing memory
-    memory_manager = get_memory_manager()
-    memory_manager.clear_all()
-    logging.info("Memory cleared")
-    
-    # Test 1: Create a dragon
-    logging.info("TEST 1: Create a dragon")
-    dragon_id = test_prompt("Make me a glowing dragon standing on a cliff at sunset")
-    time.sleep(1)  # Pause to make timestamps different
-    
-    # Test 2: Create a robot
-    logging.info("TEST 2: Create a robot")
-    robot_id = test_prompt("Design a futuristic humanoid robot with glowing blue eyes")
-    time.sleep(1)  # Pause to make timestamps different
-    
-    # Test 3: Create a landscape
-    logging.info("TEST 3: Create a landscape")
-    landscape_id = test_prompt("Create a beautiful mountain landscape with a lake and forest")
-    time.sleep(1)  # Pause to make timestamps different
-    
-    # Test 4: Query for recent items
-    logging.info("TEST 4: Query for recent items")
-    recent_results = test_memory_query("Show me my recent creations")
-    
-    # Test 5: Query for dragons
-    logging.info("TEST 5: Query for dragons")
-    dragon_results = test_memory_query("Find dragons")
-    
-    # Test 6: Query with limit
-    logging.info("TEST 6: Query with limit")
-    limited_results = test_memory_query("Get my last 2 creations")
-    
-    # Test 7: Complex query
-    logging.info("TEST 7: Complex query")
-    complex_results = test_memory_query("Find items with glowing features")
-    
-    logging.info("All tests completed successfully")
+    MEMORY_MANAGER.clear_all()
+    log.info("Memory cleared")
+    
+    # Tests 1-3: Create a dragon, a robot and a landscape in one batch;
+    # each entry gets its own timestamp, so no pause between them is needed
+    log.info("TESTS 1-3: Create a dragon, a robot and a landscape")
+    creation_prompts = [
+        "Make me a glowing dragon standing on a cliff at sunset",
+        "Design a futuristic humanoid robot with glowing blue eyes",
+        "Create a beautiful mountain landscape with a lake and forest",
+    ]
+    dragon_id, robot_id, landscape_id = test_prompts(creation_prompts)
+    
+    # Tests 4-7: Query for recent items, dragons, with a limit and a complex query;
+    # the queries are answered together with one memory search pass
+    log.info("TESTS 4-7: Query for recent items, dragons, with a limit and a complex query")
+    queries = [
+        "Show me my recent creations",
+        "Find dragons",
+        "Get my last 2 creations",
+        "Find items with glowing features",
+    ]
+    recent_results, dragon_results, limited_results, complex_results = test_memory_queries(queries)
+    
+    log.info("All tests completed successfully")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Test the creative AI pipeline")
@@ -12,6 +12,12 @@ from typing import Optional, Callable
 # Get the directory of this file
 COMPONENT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Static Web Speech component, declared once; settings are passed as props on each render
+_voice_component = components.declare_component(
+    "voice_to_text",
+    path=os.path.join(COMPONENT_DIR, "voice_component")
+)
+
 def create_voice_to_text(
     language: str = "en-US",
     continuous: bool = False,
@@ -32,149 +38,23 @@ def create_voice_to_text(
     Returns:
         str: The recognized text
     """
-    # Create a unique key if none is provided
+    # Derive a key from the arguments if none is provided; it must be the same
+    # on every rerun, or Streamlit would remount the component and drop its value
     if key is None:
-        key = "voice_input_" + str(id(placeholder))
+        key = f"voice_input_{language}_{placeholder}"
     
     # Create a unique session state key for storing the result
     result_key = f"{key}_result"
     
-    # Initialize session state for storing the result
-    if result_key not in st.session_state:
-        st.session_state[result_key] = ""
-    
-    # Define the HTML/JS code for the voice-to-text component
-    component_html = f"""
-    <script>
-    // Voice-to-text component using Web Speech API
-    const setupVoiceInput = () => {{
-        if (!('webkitSpeechRecognition' in window) && !('SpeechRecognition' in window)) {{
-            console.error('Speech recognition not supported in this browser');
-            document.getElementById('voice-button-{key}').innerText = 'Speech recognition not supported';
-            document.getElementById('voice-button-{key}').disabled = true;
-            return;
-        }}
-        
-        // Create speech recognition object
-        const SpeechRecognition = window.SpeechRecognition || window.webkitSpeechRecognition;
-        const recognition = new SpeechRecognition();
-        
-        // Configure recognition
-        recognition.lang = '{language}';
-        recognition.continuous = {str(continuous).lower()};
-        recognition.interimResults = false;
-        
-        // Variables to track state
-        let isListening = false;
-        const button = document.getElementById('voice-button-{key}');
-        const status = document.getElementById('voice-status-{key}');
-        
-        // Handle start/stop button
-        button.onclick = () => {{
-            if (isListening) {{
-                recognition.stop();
-                button.classList.remove('recording');
-                button.innerText = '{placeholder}';
-                status.innerText = '';
-            }} else {{
-                recognition.start();
-                button.classList.add('recording');
-                button.innerText = 'Listening... Click to stop';
-                status.innerText = 'Listening...';
-            }}
-            isListening = !isListening;
-        }};
-        
-        // Handle speech recognition results
-        recognition.onresult = (event) => {{
-            const transcript = event.results[0][0].transcript;
-            document.getElementById('voice-output-{key}').innerText = transcript;
-            
-            // Send result back to Streamlit
-            const data = {{
-                result: transcript,
-                key: '{result_key}'
-            }};
-            window.parent.postMessage({{
-                type: 'streamlit:setComponentValue',
-                value: data
-            }}, '*');
-        }};
-        
-        // Handle errors
-        recognition.onerror = (event) => {{
-            console.error('Speech recognition error', event.error);
-            status.innerText = 'Error: ' + event.error;
-            button.classList.remove('recording');
-            button.innerText = '{placeholder}';
-            isListening = false;
-        }};
-        
-        // Handle end of speech recognition
-        recognition.onend = () => {{
-            button.classList.remove('recording');
-            button.innerText = '{placeholder}';
-            status.innerText = '';
-            isListening = false;
-        }};
-    }};
-    
-    // Set up when the document is loaded
-    document.addEventListener('DOMContentLoaded', setupVoiceInput);
-    </script>
-    
-    <style>
-    .voice-container {{
-        margin-bottom: 10px;
-    }}
-    .voice-button {{
-        background-color: #f0f2f6;
-        border: 1px solid #ccc;
-        border-radius: 4px;
-        padding: 10px 15px;
-        font-size: 14px;
-        cursor: pointer;
-        transition: background-color 0.3s, color 0.3s;
-        width: 100%;
-        text-align: center;
-    }}
-    .voice-button:hover {{
-        background-color: #e0e2e6;
-    }}
-    .voice-button.recording {{
-        background-color: #ff4b4b;
-        color: white;
-        animation: pulse 1.5s infinite;
-    }}
-    @keyframes pulse {{
-        0% {{ opacity: 1; }}
-        50% {{ opacity: 0.8; }}
-        100% {{ opacity: 1; }}
-    }}
-    .voice-status {{
-        font-size: 12px;
-        color: #888;
-        height: 16px;
-        margin-top: 4px;
-        text-align: center;
-    }}
-    .voice-output {{
-        display: none;
-    }}
-    </style>
-    
-    <div class="voice-container">
-        <button id="voice-button-{key}" class="voice-button">{placeholder}</button>
-        <div id="voice-status-{key}" class="voice-status"></div>
-        <div id="voice-output-{key}" class="voice-output"></div>
-    </div>
-    """
-    
-    # Render the HTML component
-    components.html(component_html, height=100)
-    
-    # Handle the result from the component
-    component_value = st.session_state.get(result_key, "")
+    # Render the component; its value is the latest recognized text
+    component_value = _voice_component(
+        language=language,
+        continuous=continuous,
+        placeholder=placeholder,
+        key=key,
+        default=""
+    )
+    st.session_state[result_key] = component_value
     
     # Call the callback function if provided and there's a new result
     if callback is not None and component_value:
@@ -201,35 +81,29 @@ def voice_input_area(
         str: The input text (either from voice or manual typing)
     """
     if key is None:
-        key = "voice_input_" + str(id(label))
+        key = f"voice_input_{label}"
     
     text_key = f"{key}_text"
-    
-    if text_key not in st.session_state:
-        st.session_state[text_key] = ""
+    voice_key = f"{key}_last_voice"
     
     st.markdown(f"### {label}")
     
-    # Define callback to update text area when speech is recognized
-    def update_text_area(text):
-        st.session_state[text_key] = text
-    
     # Create the voice input component
     voice_result = create_voice_to_text(
         language=language,
         placeholder=placeholder,
-        key=key,
-        callback=update_text_area
+        key=key
     )
     
-    # If we got new voice input, update the text area
-    if voice_result:
+    # Copy new speech into the text area's state once, before the widget is created;
+    # after that the widget's key alone manages the text
+    if voice_result != st.session_state.get(voice_key, ""):
+        st.session_state[voice_key] = voice_result
         st.session_state[text_key] = voice_result
     
     # Create a text area that shows the recognized speech and allows manual editing
     text_input = st.text_area(
         label="Edit or type manually if needed:",
-        value=st.session_state[text_key],
         key=text_key,
         height=100
     )
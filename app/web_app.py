@@ -6,7 +6,6 @@ This provides a user-friendly way to interact with the AI pipeline.
 
 import json
 import os
-import base64
 import sys
 import time
 from datetime import datetime
@@ -21,54 +20,60 @@ from core.file_manager import get_file_manager
 from core.memory_query import get_memory_query_handler
 from core.stub import Stub
 from ontology_dc8f06af066e4a7880a5938933236037.config import ConfigClass
-from ontology_dc8f06af066e4a7880a5938933236037.input import InputClass
-from ontology_dc8f06af066e4a7880a5938933236037.output import OutputClass
-from openfabric_pysdk.context import AppModel
+
+# Panels rerun on their own with st.fragment (Streamlit 1.37+, experimental from 1.33);
+# on older versions they simply run as part of the whole script
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
 
 # Set Openfabric app IDs
 TEXT_TO_IMAGE_APP_ID = "f0997a01-d6d3-a5fe-53d8-561300318557"
 IMAGE_TO_3D_APP_ID = "69543f29-4d41-4afc-7f29-3d51591f11eb"
 
+# Ignored words for automatic tag extraction
+_TAG_STOPWORDS = frozenset({'with', 'and', 'the', 'this', 'that', 'make', 'create', 'generate'})
+MAX_AUTO_TAGS = 5
+
 # Initialize components
 llm_enhancer = get_llm_enhancer()
-memory_manager = get_memory_manager()
-file_manager = get_file_manager()
-memory_query_handler = get_memory_query_handler()
+
+@st.cache_resource(show_spinner=False)
+def initialize_components():
+    """Initialize the memory and file services (cached so every rerun and session shares them)."""
+    return get_memory_manager(), get_file_manager(), get_memory_query_handler()
+
+memory_manager, file_manager, memory_query_handler = initialize_components()
+
+# Initialize the Stub for the Openfabric apps
+@st.cache_resource
+def get_stub():
+    """Initialize the Stub with app IDs (cached so its connections are reused across reruns)."""
+    config = ConfigClass()
+    config.app_ids = [TEXT_TO_IMAGE_APP_ID, IMAGE_TO_3D_APP_ID]
+    return Stub(config.app_ids)
 
 # Helper functions
 def display_image(image_path):
-    """Display an image from a file path."""
+    """Display an image from a file path, served through Streamlit's media endpoint."""
     if os.path.exists(image_path):
-        image_data = open(image_path, "rb").read()
-        b64 = base64.b64encode(image_data).decode()
-        return f'<img src="data:image/png;base64,{b64}" style="max-width:100%;">'
-    return "Image not found"
+        st.image(image_path, use_column_width=True)
+    else:
+        st.markdown("Image not found")
+
+def load_model_data(model_path):
+    """Load a 3D model for download through the file manager, which caches it until the file changes."""
+    return file_manager.load_file(model_path)
 
 def display_model(model_path):
     """Display a 3D model file link."""
-    if os.path.exists(model_path):
-        size = os.path.getsize(model_path)
+    exists, size, _ = file_manager.get_file_info(model_path)
+    if exists:
         return f'3D Model file available ({size/1024:.2f} KB)'
     return "Model not found"
 
 def process_creation(prompt):
     """Process a creation request from the prompt."""
-    # Create a request
-    request = InputClass()
-    request.prompt = prompt
-    
-    # Create a response
-    response = OutputClass()
-    
-    # Create an app model
-    model = AppModel()
-    model.request = request
-    model.response = response
-    
-    # Initialize the Stub with app IDs
-    config = ConfigClass()
-    config.app_ids = [TEXT_TO_IMAGE_APP_ID, IMAGE_TO_3D_APP_ID]
-    stub = Stub(config.app_ids)
+    # Get the Stub shared across reruns
+    stub = get_stub()
     
     # Create a new memory entry
     memory_entry = MemoryEntry(original_prompt=prompt)
@@ -92,9 +97,11 @@ def process_creation(prompt):
             if not image_data:
                 raise Exception("No image data returned from Text to Image app")
             
-            # Save the image to disk
-            image_path = file_manager.save_image(image_data, memory_entry.id)
+            # Save the image and its listing thumbnail to disk
+            image_path, thumb_path = file_manager.save_image_with_thumbnail(image_data, memory_entry.id)
             memory_entry.image_path = image_path
+            if thumb_path:
+                memory_entry.metadata['thumb_path'] = thumb_path
     except Exception as e:
         st.error(f"Error generating image: {str(e)}")
         return None
@@ -115,12 +122,14 @@ def process_creation(prompt):
     except Exception as e:
         st.warning(f"Image generated successfully, but error creating 3D model: {str(e)}")
     
-    # Add automatic tags from the prompt
-    words = prompt.lower().split()
-    important_words = [word for word in words if len(word) > 3 and word not in 
-                      ['with', 'and', 'the', 'this', 'that', 'make', 'create', 'generate']]
-    if important_words:
-        tags = important_words[:5]  # Limit to 5 tags
+    # Add automatic tags from the prompt, stopping at the tag limit
+    tags = []
+    for word in prompt.lower().split():
+        if len(word) > 3 and word not in _TAG_STOPWORDS:
+            tags.append(word)
+            if len(tags) == MAX_AUTO_TAGS:
+                break
+    if tags:
         memory_entry.metadata['tags'] = tags
     
     # Save the memory entry
@@ -134,6 +143,111 @@ def process_query(prompt):
     results, summary = memory_query_handler.process_query(prompt)
     return results, summary
 
+@fragment
+def creation_panel():
+    """Render the Create tab; with fragments, its widgets rerun only this panel."""
+    st.markdown("""
+    Enter a descriptive prompt, and the AI will:
+    1. Enhance it with creative details
+    2. Generate an image
+    3. Convert the image to a 3D model
+    """)
+    
+    prompt = st.text_area("Your prompt:", height=100, 
+                        placeholder="Example: A floating crystal city in the clouds")
+    
+    if st.button("Generate", key="generate_button"):
+        if not prompt:
+            st.error("Please enter a prompt.")
+        else:
+            result = process_creation(prompt)
+            
+            if result:
+                st.success("Creation successful!")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("### Original Prompt")
+                    st.write(result.original_prompt)
+                    
+                    st.markdown("### Enhanced Prompt")
+                    st.write(result.enhanced_prompt)
+                    
+                    st.markdown("### Tags")
+                    tags = result.metadata.get('tags', [])
+                    st.write(", ".join(tags))
+                
+                with col2:
+                    st.markdown("### Generated Image")
+                    if result.image_path and os.path.exists(result.image_path):
+                        display_image(result.image_path)
+                    else:
+                        st.warning("Image not available.")
+                    
+                    st.markdown("### 3D Model")
+                    if result.model_path and os.path.exists(result.model_path):
+                        st.markdown(display_model(result.model_path))
+                        st.download_button(
+                            label="Download 3D Model",
+                            data=load_model_data(result.model_path),
+                            file_name=os.path.basename(result.model_path),
+                            mime="application/octet-stream"
+                        )
+                    else:
+                        st.warning("3D model not available.")
+
+@fragment
+def search_panel():
+    """Render the Search tab; with fragments, its widgets rerun only this panel."""
+    st.markdown("""
+    Search your past creations using natural language queries:
+    - "Show me recent dragons"
+    - "Find castles with clouds"
+    - "Get my last 3 creations"
+    """)
+    
+    search_prompt = st.text_input("Search prompt:", placeholder="Example: Find my recent creations")
+    
+    if st.button("Search", key="search_button"):
+        if not search_prompt:
+            st.error("Please enter a search prompt.")
+        else:
+            results, summary = process_query(search_prompt)
+            
+            st.markdown(f"### {summary}")
+            
+            if results:
+                for result in results:
+                    with st.expander(f"{result['original_prompt']} ({result['date']})"):
+                        col1, col2 = st.columns(2)
+                        
+                        with col1:
+                            st.markdown("**Original Prompt:**")
+                            st.write(result['original_prompt'])
+                            
+                            st.markdown("**Enhanced Prompt:**")
+                            st.write(result.get('enhanced_prompt', 'N/A'))
+                            
+                            st.markdown("**Tags:**")
+                            tags = result.get('metadata', {}).get('tags', [])
+                            st.write(", ".join(tags))
+                        
+                        with col2:
+                            if 'image_path' in result and result.get('image_exists', False):
+                                st.markdown("**Generated Image:**")
+                                display_image(result.get('metadata', {}).get('thumb_path') or result['image_path'])
+                            
+                            if 'model_path' in result and result.get('model_exists', False):
+                                st.markdown("**3D Model:**")
+                                st.markdown(display_model(result['model_path']))
+                                st.download_button(
+                                    label="Download 3D Model",
+                                    data=load_model_data(result['model_path']),
+                                    file_name=os.path.basename(result['model_path']),
+                                    mime="application/octet-stream"
+                                )
+
 # Streamlit app
 def main():
     st.set_page_config(
@@ -149,106 +263,11 @@ def main():
     
     # Creation tab
     with tab1:
-        st.markdown("""
-        Enter a descriptive prompt, and the AI will:
-        1. Enhance it with creative details
-        2. Generate an image
-        3. Convert the image to a 3D model
-        """)
-        
-        prompt = st.text_area("Your prompt:", height=100, 
-                            placeholder="Example: A floating crystal city in the clouds")
-        
-        if st.button("Generate", key="generate_button"):
-            if not prompt:
-                st.error("Please enter a prompt.")
-            else:
-                result = process_creation(prompt)
-                
-                if result:
-                    st.success("Creation successful!")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown("### Original Prompt")
-                        st.write(result.original_prompt)
-                        
-                        st.markdown("### Enhanced Prompt")
-                        st.write(result.enhanced_prompt)
-                        
-                        st.markdown("### Tags")
-                        tags = result.metadata.get('tags', [])
-                        st.write(", ".join(tags))
-                    
-                    with col2:
-                        st.markdown("### Generated Image")
-                        if result.image_path and os.path.exists(result.image_path):
-                            st.markdown(display_image(result.image_path), unsafe_allow_html=True)
-                        else:
-                            st.warning("Image not available.")
-                        
-                        st.markdown("### 3D Model")
-                        if result.model_path and os.path.exists(result.model_path):
-                            st.markdown(display_model(result.model_path))
-                            st.download_button(
-                                label="Download 3D Model",
-                                data=open(result.model_path, "rb").read(),
-                                file_name=os.path.basename(result.model_path),
-                                mime="application/octet-stream"
-                            )
-                        else:
-                            st.warning("3D model not available.")
+        creation_panel()
     
     # Search tab
     with tab2:
-        st.markdown("""
-        Search your past creations using natural language queries:
-        - "Show me recent dragons"
-        - "Find castles with clouds"
-        - "Get my last 3 creations"
-        """)
-        
-        search_prompt = st.text_input("Search prompt:", placeholder="Example: Find my recent creations")
-        
-        if st.button("Search", key="search_button"):
-            if not search_prompt:
-                st.error("Please enter a search prompt.")
-            else:
-                results, summary = process_query(search_prompt)
-                
-                st.markdown(f"### {summary}")
-                
-                if results:
-                    for result in results:
-                        with st.expander(f"{result['original_prompt']} ({result['date']})"):
-                            col1, col2 = st.columns(2)
-                            
-                            with col1:
-                                st.markdown("**Original Prompt:**")
-                                st.write(result['original_prompt'])
-                                
-                                st.markdown("**Enhanced Prompt:**")
-                                st.write(result.get('enhanced_prompt', 'N/A'))
-                                
-                                st.markdown("**Tags:**")
-                                tags = result.get('metadata', {}).get('tags', [])
-                                st.write(", ".join(tags))
-                            
-                            with col2:
-                                if 'image_path' in result and result.get('image_exists', False):
-                                    st.markdown("**Generated Image:**")
-                                    st.markdown(display_image(result['image_path']), unsafe_allow_html=True)
-                                
-                                if 'model_path' in result and result.get('model_exists', False):
-                                    st.markdown("**3D Model:**")
-                                    st.markdown(display_model(result['model_path']))
-                                    st.download_button(
-                                        label="Download 3D Model",
-                                        data=open(result['model_path'], "rb").read(),
-                                        file_name=os.path.basename(result['model_path']),
-                                        mime="application/octet-stream"
-                                    )
+        search_panel()
 
     # Display information about the app
     st.sidebar.title("About")
@@ -269,7 +288,7 @@ def main():
     )
     
     st.sidebar.title("Statistics")
-    memory_count = len(memory_manager.search(limit=1000))
+    memory_count = memory_manager.count()
     st.sidebar.metric("Total Creations", memory_count)
     
     # Footer